@@ -0,0 +1,110 @@
+"""
+Пакетне розв'язання сценаріїв "що, якщо" для мережі максимального потоку
+
+Базова мережа передається робочим процесам один раз: при запуску через
+fork її масиви успадковуються без серіалізації, на інших платформах
+мережа серіалізується один раз на процес в ініціалізаторі пулу. Кожен
+сценарій - це лише словник нових пропускних здатностей наявних ребер.
+"""
+
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from task1 import MaxFlowNetwork
+
+
+Scenario = Dict[Tuple[str, str], Any]
+
+# Базова мережа робочого процесу: (мережа, джерело, стік, алгоритм)
+_BASE: Optional[Tuple[MaxFlowNetwork, str, str, str]] = None
+
+
+def close_node(network: MaxFlowNetwork, node: str) -> Scenario:
+    """Сценарій закриття вузла: усі його вхідні та вихідні ребра отримують нульову пропускну здатність"""
+    scenario = {}
+    for from_node, targets in network.original_capacities.items():
+        for to_node in targets:
+            if node in (from_node, to_node):
+                scenario[(from_node, to_node)] = 0
+    return scenario
+
+
+def scale_capacities(network: MaxFlowNetwork, factor: float,
+                     edges: Optional[List[Tuple[str, str]]] = None) -> Scenario:
+    """Сценарій масштабування пропускних здатностей (усіх скінченних або лише вказаних ребер)"""
+    capacities = network.original_capacities
+    if edges is None:
+        edges = [(u, v) for u, targets in capacities.items() for v in targets]
+    return {
+        (u, v): int(capacities[u][v] * factor)
+        for u, v in edges
+        if capacities[u][v] != float('inf')
+    }
+
+
+def _init_worker(network: MaxFlowNetwork, source: str, sink: str, algorithm: str):
+    """Ініціалізатор пулу: зберігає базову мережу в глобальній змінній процесу"""
+    global _BASE
+    _BASE = (network, source, sink, algorithm)
+
+
+def _solve_scenario(scenario: Scenario) -> Dict[str, Any]:
+    """Розв'язує один сценарій на копії базової мережі"""
+    network, source, sink, algorithm = _BASE
+    instance = network.copy_with_capacities(scenario)
+    max_flow = instance.solve(source, sink, algorithm)
+    cut = instance.min_cut()
+    return {
+        'max_flow': max_flow,
+        'cut_edges': cut['cut_edges'],
+        'cut_capacity': cut['cut_capacity'],
+    }
+
+
+def solve_scenarios(network: MaxFlowNetwork, source: str, sink: str, scenarios: List[Scenario],
+                    algorithm: str = 'dinic', workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Розв'язує список сценаріїв паралельно в пулі процесів
+
+    Args:
+        network: базова мережа (її власний потік не змінюється)
+        source: назва джерела
+        sink: назва стоку
+        scenarios: список словників нових пропускних здатностей
+        algorithm: алгоритм з task1.SOLVERS
+        workers: кількість процесів (за замовчуванням - кількість ядер)
+
+    Returns:
+        Для кожного сценарію, у тому ж порядку: максимальний потік
+        і ребра мінімального розрізу
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(scenarios)))
+
+    if workers == 1:
+        # Без пулу: та сама логіка в поточному процесі
+        _init_worker(network, source, sink, algorithm)
+        return [_solve_scenario(scenario) for scenario in scenarios]
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    # Кілька порцій на процес вирівнюють навантаження між сценаріями різної складності
+    chunksize = max(1, len(scenarios) // (workers * 4))
+
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(network, source, sink, algorithm)) as pool:
+        return pool.map(_solve_scenario, scenarios, chunksize)
+
+
+if __name__ == "__main__":
+    from task1 import create_logistics_network
+
+    network, source, sink = create_logistics_network()
+    scenarios = [close_node(network, f"Склад {i}") for i in range(1, 5)]
+    scenarios.append(scale_capacities(network, 0.5))
+
+    for index, result in enumerate(solve_scenarios(network, source, sink, scenarios)):
+        print(f"Сценарій {index + 1}: максимальний потік {result['max_flow']}, "
+              f"ребер у розрізі {len(result['cut_edges'])}")
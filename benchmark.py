@@ -0,0 +1,457 @@
+"""
+Бенчмарки алгоритмів максимального потоку і префіксного дерева
+
+Порівнює Едмондса-Карпа, Дініца та push-relabel на синтетичних
+багаторівневих мережах термінал → склад → магазин різного розміру
+і показує, з якого розміру мережі кожен алгоритм стає вигіднішим.
+Для префіксного дерева вимірює пам'ять на один ключ у різних
+представленнях вузлів, швидкість масової побудови і масштабування
+шардованого дерева з кількістю процесів.
+
+Регресійний набір (run_regression_suite) вимірює час і пікову пам'ять
+основних операцій обох задач на синтетичних мережах і корпусах слів із
+розподілом Ціпфа та зберігає результати в JSON для порівняння версій:
+
+    python benchmark.py --json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from trie import Trie
+from task1 import MaxFlowNetwork, SOLVERS, ROLE_TERMINAL, ROLE_WAREHOUSE, ROLE_STORE
+from task2 import Homework
+from sharded_trie import ShardedTrie
+
+
+def create_layered_network(terminals: int, warehouses: int, stores: int,
+                           fan_out: int = 3, seed: int = 42) -> Tuple[MaxFlowNetwork, str, str]:
+    """
+    Створює синтетичну логістичну мережу з трьома рівнями
+
+    Args:
+        terminals: кількість терміналів
+        warehouses: кількість складів
+        stores: кількість магазинів
+        fan_out: кількість вихідних маршрутів з кожного термінала і складу
+        seed: зерно генератора випадкових чисел
+
+    Returns:
+        Мережа, назва супер-джерела і назва супер-стоку
+    """
+    rng = random.Random(seed)
+    network = MaxFlowNetwork()
+    super_source = "Супер-джерело"
+    super_sink = "Супер-стік"
+
+    for t in range(1, terminals + 1):
+        terminal = f"Термінал {t}"
+        network.add_edge(super_source, terminal, float('inf'))
+        network.set_node_role(terminal, ROLE_TERMINAL)
+        for w in rng.sample(range(1, warehouses + 1), min(fan_out, warehouses)):
+            network.add_edge(terminal, f"Склад {w}", rng.randint(10, 100))
+
+    for w in range(1, warehouses + 1):
+        warehouse = f"Склад {w}"
+        network.set_node_role(warehouse, ROLE_WAREHOUSE)
+        for s in rng.sample(range(1, stores + 1), min(fan_out, stores)):
+            network.add_edge(warehouse, f"Магазин {s}", rng.randint(1, 40))
+
+    for s in range(1, stores + 1):
+        network.add_edge(f"Магазин {s}", super_sink, float('inf'))
+        network.set_node_role(f"Магазин {s}", ROLE_STORE)
+
+    return network, super_source, super_sink
+
+
+def time_solver(algorithm: str, terminals: int, warehouses: int, stores: int,
+                fan_out: int, repeats: int = 3) -> Tuple[float, int]:
+    """Повертає найкращий час розв'язання (с) і величину потоку"""
+    best = float('inf')
+    max_flow = 0
+    for _ in range(repeats):
+        network, source, sink = create_layered_network(terminals, warehouses, stores, fan_out)
+        start = time.perf_counter()
+        max_flow = network.solve(source, sink, algorithm)
+        best = min(best, time.perf_counter() - start)
+    return best, max_flow
+
+
+def run_crossover_benchmark(sizes: List[Tuple[int, int, int]] = None, fan_out: int = 4) -> List[Dict]:
+    """
+    Вимірює час кожного алгоритму на мережах зростаючого розміру
+
+    Returns:
+        Список рядків результатів: розмір мережі, потік і час кожного алгоритму
+    """
+    if sizes is None:
+        sizes = [
+            (2, 4, 14),
+            (5, 20, 100),
+            (10, 100, 1000),
+            (20, 400, 5000),
+            (50, 1000, 20000),
+        ]
+
+    print(f"{'Т/С/М':<20} {'Потік':<10} " + " ".join(f"{alg:>14}" for alg in SOLVERS) + " Найшвидший")
+    print("-" * 90)
+
+    results = []
+    for terminals, warehouses, stores in sizes:
+        timings = {}
+        flows = set()
+        for algorithm in SOLVERS:
+            elapsed, max_flow = time_solver(algorithm, terminals, warehouses, stores, fan_out)
+            timings[algorithm] = elapsed
+            flows.add(max_flow)
+
+        if len(flows) != 1:
+            raise RuntimeError(f"Алгоритми дали різні потоки: {flows}")
+
+        fastest = min(timings, key=timings.get)
+        size = f"{terminals}/{warehouses}/{stores}"
+        print(f"{size:<20} {flows.pop():<10} "
+              + " ".join(f"{timings[alg] * 1000:>9.2f} мс   " for alg in SOLVERS)
+              + f" {fastest}")
+        results.append({'size': (terminals, warehouses, stores), 'timings': timings, 'fastest': fastest})
+
+    return results
+
+
+def generate_words(count: int, seed: int = 42) -> List[str]:
+    """Генерує count унікальних випадкових слів довжиною 3-12 символів"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))))
+    return sorted(words)
+
+
+def measure_memory_per_key(build: Callable[[List[str]], object], words: List[str]) -> float:
+    """Повертає кількість байтів на ключ, які займає структура після побудови"""
+    tracemalloc.start()
+    structure = build(words)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del structure
+    return used / len(words)
+
+
+def _fill(trie, words: List[str]):
+    """Заповнює дерево словами зі значеннями-індексами"""
+    for i, word in enumerate(words):
+        trie.put(word, i)
+    return trie
+
+
+def run_trie_memory_benchmark(counts: Tuple[int, ...] = (10000, 100000)) -> List[Dict]:
+    """Порівнює пам'ять на ключ для різних представлень префіксного дерева"""
+    variants = {
+        'Trie (базовий)': lambda words: _fill(Trie(), words),
+        'Homework': lambda words: _fill(Homework(), words),
+        'Homework з індексом суфіксів': lambda words: _fill(Homework(suffix_index=True), words),
+        'Homework.freeze()': lambda words: _fill(Homework(), words).freeze(),
+        'з суфіксами + freeze()': lambda words: _fill(Homework(suffix_index=True), words).freeze(),
+    }
+
+    print(f"{'Представлення':<28}" + "".join(f"{count:>14} ключів" for count in counts))
+    print("-" * (28 + 21 * len(counts)))
+
+    results = []
+    word_sets = {count: generate_words(count) for count in counts}
+    for name, build in variants.items():
+        per_key = [measure_memory_per_key(build, word_sets[count]) for count in counts]
+        print(f"{name:<28}" + "".join(f"{value:>12.1f} байт/ключ" for value in per_key))
+        results.append({'variant': name, 'bytes_per_key': dict(zip(counts, per_key))})
+
+    return results
+
+
+def run_bulk_load_benchmark(count: int = 100000) -> Dict[str, Dict[str, float]]:
+    """Порівнює пропускну здатність побудови дерева: put по одному ключу проти from_sorted"""
+    words = generate_words(count)
+    variants = {
+        'put() по одному': lambda: _fill(Homework(), words),
+        'from_sorted()': lambda: Homework.from_sorted(words),
+        # Мінімізація об'єднує лише піддерева без значень - порівнюємо з тим самим входом
+        'from_sorted() без значень': lambda: Homework.from_sorted((word, None) for word in words),
+        'from_sorted(minimize=True)': lambda: Homework.from_sorted(words, minimize=True),
+    }
+
+    print(f"{'Побудова ({} ключів)'.format(count):<30} {'ключів/с':>12} {'байт/ключ':>12}")
+    print("-" * 56)
+
+    results = {}
+    for name, build in variants.items():
+        start = time.perf_counter()
+        build()
+        elapsed = time.perf_counter() - start
+        per_key = measure_memory_per_key(lambda _: build(), words)
+        print(f"{name:<30} {count / elapsed:>12.0f} {per_key:>12.1f}")
+        results[name] = {'keys_per_second': count / elapsed, 'bytes_per_key': per_key}
+
+    return results
+
+
+def run_sharded_benchmark(count: int = 200000,
+                          shard_counts: Optional[Tuple[int, ...]] = None) -> Dict[int, Dict[str, float]]:
+    """
+    Вимірює, як масова побудова і пакетні запити ShardedTrie масштабуються
+    з кількістю шардів; приріст можливий лише до кількості ядер машини
+
+    Пік пам'яті - лише головного процесу (tracemalloc не бачить шардів):
+    ключі йдуть до шардів потоком, тож він не залежить від розміру словника.
+    """
+    words = generate_words(count)
+    prefixes = [word[:3] for word in words[::7]] + [word[::-1][:3] for word in words[::7]]
+    if shard_counts is None:
+        shard_counts = tuple(sorted({1, 2, 4, os.cpu_count() or 1}))
+
+    print(f"Шардоване дерево: {count} ключів, {len(prefixes)} префіксів, ядер: {os.cpu_count()}")
+    print(f"{'Шардів':<8} {'побудова, ключів/с':>20} {'has_prefix_many, запитів/с':>28} {'пік головного, МБ':>18}")
+    print("-" * 77)
+
+    results = {}
+    for shards in shard_counts:
+        # Пам'ять вимірюється окремою побудовою: tracemalloc сповільнює головний процес
+        tracemalloc.start()
+        ShardedTrie.from_sorted(words, shards=shards).close()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        trie = ShardedTrie.from_sorted(words, shards=shards)
+        build_time = time.perf_counter() - start
+        with trie:
+            start = time.perf_counter()
+            trie.has_prefix_many(prefixes)
+            query_time = time.perf_counter() - start
+        print(f"{shards:<8} {count / build_time:>20.0f} {len(prefixes) / query_time:>28.0f} {peak / 2**20:>18.1f}")
+        results[shards] = {
+            'keys_per_second': count / build_time,
+            'queries_per_second': len(prefixes) / query_time,
+            'front_end_peak_bytes': peak,
+        }
+
+    return results
+
+
+def generate_zipf_corpus(tokens: int, vocabulary: int, exponent: float = 1.1,
+                         seed: int = 42) -> List[str]:
+    """
+    Генерує корпус слів, частоти яких підкоряються закону Ціпфа
+
+    Args:
+        tokens: кількість слів у корпусі (з повтореннями)
+        vocabulary: кількість різних слів
+        exponent: показник розподілу (частота слова рангу r ~ 1 / r^exponent)
+        seed: зерно генератора випадкових чисел
+
+    Returns:
+        Список слів корпусу
+    """
+    rng = random.Random(seed)
+    words = generate_words(vocabulary, seed)
+    # Ранги розподіляються між словами випадково, а не за абеткою
+    rng.shuffle(words)
+    weights = [1 / rank ** exponent for rank in range(1, vocabulary + 1)]
+    return rng.choices(words, weights=weights, k=tokens)
+
+
+def measure(run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            repeats: int = 3) -> Dict[str, float]:
+    """
+    Вимірює операцію: найкращий і середній час та пікову пам'ять
+
+    Час вимірюється без tracemalloc (він уповільнює виділення пам'яті),
+    пік пам'яті - в окремому додатковому запуску під tracemalloc.
+
+    Args:
+        run: операція, що отримує результат setup
+        setup: підготовка перед кожним запуском (поза вимірюванням)
+        repeats: кількість запусків для вимірювання часу
+
+    Returns:
+        Словник best_seconds, mean_seconds, peak_bytes
+    """
+    timings = []
+    for _ in range(repeats):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - start)
+
+    argument = setup() if setup is not None else None
+    tracemalloc.start()
+    run(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'best_seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings),
+        'peak_bytes': peak,
+    }
+
+
+def _solved_network(terminals: int, warehouses: int, stores: int, fan_out: int) -> MaxFlowNetwork:
+    """Створює багаторівневу мережу і знаходить у ній максимальний потік"""
+    network, source, sink = create_layered_network(terminals, warehouses, stores, fan_out)
+    network.edmonds_karp(source, sink)
+    return network
+
+
+def run_flow_suite(sizes: List[Tuple[int, int, int]], fan_out: int = 4,
+                   repeats: int = 3) -> List[Dict[str, Any]]:
+    """Вимірює edmonds_karp і get_flow_analysis на мережах заданих розмірів"""
+    results = []
+    for terminals, warehouses, stores in sizes:
+        network, _, _ = create_layered_network(terminals, warehouses, stores, fan_out)
+        # Розв'язувач продовжує з поточного стану, тож кожен запуск отримує нову мережу
+        solve = measure(
+            lambda instance: instance[0].edmonds_karp(instance[1], instance[2]),
+            lambda: create_layered_network(terminals, warehouses, stores, fan_out),
+            repeats,
+        )
+        solved = _solved_network(terminals, warehouses, stores, fan_out)
+        analysis = measure(lambda _: solved.get_flow_analysis(), repeats=repeats)
+        results.append({
+            'size': {'terminals': terminals, 'warehouses': warehouses, 'stores': stores,
+                     'fan_out': fan_out, 'nodes': len(network.node_names),
+                     'edges': len(network.edge_to) // 2},
+            'max_flow': solved.flow_value,
+            'edmonds_karp': solve,
+            'get_flow_analysis': analysis,
+        })
+    return results
+
+
+def run_trie_suite(corpus_sizes: List[Tuple[int, int]], queries: int = 10000,
+                   repeats: int = 3, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Вимірює put, count_words_with_suffix, has_prefix і get_statistics
+    на корпусах Ціпфа
+
+    Запити беруться з того ж корпусу: популярні слова запитуються частіше,
+    як і в реальному пошуку. Значення слова - його частота в корпусі.
+
+    Args:
+        corpus_sizes: пари (кількість слів у корпусі, розмір словника)
+        queries: кількість запитів кожного виду на один вимір
+    """
+    results = []
+    for tokens, vocabulary in corpus_sizes:
+        corpus = generate_zipf_corpus(tokens, vocabulary, seed=seed)
+        frequencies = {}
+        for word in corpus:
+            frequencies[word] = frequencies.get(word, 0) + 1
+
+        def build(_):
+            # Вимірюється саме індексований запит за суфіксом
+            trie = Homework(suffix_index=True)
+            for word, frequency in frequencies.items():
+                trie.put(word, frequency)
+            return trie
+
+        trie = build(None)
+        rng = random.Random(seed)
+        sampled = rng.choices(corpus, k=queries)
+        prefixes = [word[:rng.randint(1, len(word))] for word in sampled]
+        suffixes = [word[-rng.randint(1, min(4, len(word))):] for word in sampled]
+
+        results.append({
+            'corpus': {'tokens': tokens, 'vocabulary': vocabulary, 'unique_words': len(frequencies),
+                       'queries': queries},
+            'put': measure(build, repeats=repeats),
+            'count_words_with_suffix': measure(
+                lambda _: [trie.count_words_with_suffix(suffix) for suffix in suffixes], repeats=repeats),
+            'has_prefix': measure(lambda _: [trie.has_prefix(prefix) for prefix in prefixes], repeats=repeats),
+            'get_statistics': measure(lambda _: trie.get_statistics(), repeats=repeats),
+        })
+    return results
+
+
+def run_regression_suite(network_sizes: List[Tuple[int, int, int]] = None,
+                         corpus_sizes: List[Tuple[int, int]] = None,
+                         repeats: int = 3) -> Dict[str, Any]:
+    """
+    Запускає регресійний набір вимірювань для обох задач
+
+    Returns:
+        JSON-сумісний словник: опис середовища та результати для мереж
+        і префіксного дерева
+    """
+    if network_sizes is None:
+        network_sizes = [(5, 20, 100), (10, 100, 1000), (20, 400, 5000)]
+    if corpus_sizes is None:
+        corpus_sizes = [(100000, 10000), (500000, 50000)]
+
+    return {
+        'environment': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+        },
+        'repeats': repeats,
+        'flow': run_flow_suite(network_sizes, repeats=repeats),
+        'trie': run_trie_suite(corpus_sizes, repeats=repeats),
+    }
+
+
+def print_regression_results(results: Dict[str, Any]):
+    """Друкує результати регресійного набору таблицею"""
+    operation_title, time_title, memory_title = "Операція", "Найкращий час", "Пік пам'яті"
+    print(f"{operation_title:<52} {time_title:>15} {memory_title:>15}")
+    print("-" * 84)
+    for row in results['flow']:
+        size = row['size']
+        label = f"{size['nodes']} вузлів / {size['edges']} ребер"
+        for operation in ('edmonds_karp', 'get_flow_analysis'):
+            measurement = row[operation]
+            print(f"{operation + ' (' + label + ')':<52} {measurement['best_seconds'] * 1000:>12.2f} мс"
+                  f" {measurement['peak_bytes'] / 1024:>12.1f} КБ")
+    for row in results['trie']:
+        label = f"{row['corpus']['unique_words']} слів"
+        for operation in ('put', 'count_words_with_suffix', 'has_prefix', 'get_statistics'):
+            measurement = row[operation]
+            print(f"{operation + ' (' + label + ')':<52} {measurement['best_seconds'] * 1000:>12.2f} мс"
+                  f" {measurement['peak_bytes'] / 1024:>12.1f} КБ")
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Записує результати у JSON-файл"""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки максимального потоку і префіксного дерева")
+    parser.add_argument('--json', help="шлях для збереження результатів регресійного набору")
+    parser.add_argument('--suite-only', action='store_true', help="запустити лише регресійний набір")
+    parser.add_argument('--repeats', type=int, default=3, help="кількість повторів кожного вимірювання")
+    args = parser.parse_args()
+
+    if not args.suite_only:
+        run_crossover_benchmark()
+        print()
+        run_trie_memory_benchmark()
+        print()
+        run_bulk_load_benchmark()
+        print()
+        run_sharded_benchmark()
+        print()
+
+    suite_results = run_regression_suite(repeats=args.repeats)
+    print_regression_results(suite_results)
+    if args.json:
+        save_results(suite_results, args.json)
+        print(f"\nРезультати збережено у {args.json}")
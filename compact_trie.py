@@ -0,0 +1,550 @@
+"""
+Компактне зберігання вузлів префіксного дерева
+
+CompactNode - змінний вузол з __slots__ замість словника атрибутів.
+PackedTrie - заморожене представлення у плоских масивах: ребра кожного
+вузла лежать суцільним відсортованим діапазоном (CSR), тож пошук
+дочірнього вузла - двійковий пошук у масиві міток. Його можна отримати
+пакуванням готового дерева або будувати прямо з відсортованих ключів,
+оминаючи створення CompactNode (з необов'язковою мінімізацією в DAWG).
+PackedNode надає до такого вузла той самий інтерфейс (children,
+is_end_of_word, value, word_count, best_score), що й CompactNode, тому
+алгоритми дерева працюють з обома представленнями.
+"""
+
+import json
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Формат файлу знімка: сигнатура, довжина JSON-заголовка, заголовок,
+# далі секції масивів, вирівняні на 8 байтів
+SNAPSHOT_MAGIC = b'HWTRIE02'
+
+# Масиви PackedTrie у файлі та їхні типи елементів
+SNAPSHOT_ARRAYS = (
+    ('edge_start', 'I'),
+    ('labels', 'I'),
+    ('targets', 'I'),
+    ('is_end', 'B'),
+    ('word_counts', 'I'),
+    ('values', 'q'),
+    ('best_scores', 'q'),
+)
+
+# Значення None у файлі (значення вузлів і найкращі оцінки зберігаються як int64)
+NONE_VALUE = -(1 << 63)
+
+
+def score_of(value):
+    """Оцінка слова для ранжування: числове значення або None, якщо його не можна ранжувати"""
+    if isinstance(value, (int, float)) and value == value:
+        return value
+    return None
+
+
+def common_prefix_length(first: str, second: str, limit: int) -> int:
+    """
+    Довжина спільного префікса двох рядків, не більша за limit
+
+    Двійковий пошук по зрізах: O(log L) порівнянь рядків замість
+    посимвольного циклу.
+    """
+    common = 0
+    high = min(len(first), len(second), limit)
+    while common < high:
+        middle = (common + high + 1) // 2
+        if first.startswith(second[:middle]):
+            common = middle
+        else:
+            high = middle - 1
+    return common
+
+
+def count_paths(root, paths: List[str]) -> array:
+    """
+    Повертає лічильники слів у вузлах шляхів paths (0 - шляху немає)
+
+    Для PackedNode шляхи обробляються у відсортованому порядку прямо по
+    номерах вузлів, а вузли попереднього шляху тримаються в стеку:
+    спільний префікс із попереднім шляхом не проходиться вдруге, а
+    повторні шляхи не проходяться зовсім. У змінних вузлах крок - один
+    пошук у словнику, дешевший за сортування, тож шляхи проходяться
+    по черзі без жодних накладних витрат на виклики.
+    """
+    counts = array('q', bytes(8 * len(paths)))
+    if not isinstance(root, PackedNode):
+        for position, path in enumerate(paths):
+            node = root
+            for char in path:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                counts[position] = node.word_count
+        return counts
+
+    packed = root.trie
+    child = packed.child
+    word_counts = packed.word_counts
+    # Стек містить знайдені вузли попереднього шляху (до першого відсутнього)
+    nodes = [packed.root]
+    previous = ''
+    count = 0
+    for position in sorted(range(len(paths)), key=paths.__getitem__):
+        path = paths[position]
+        if path != previous:
+            found = len(nodes) - 1
+            if found == len(previous) and path.startswith(previous):
+                # Частий випадок у відсортованому пакеті: продовження попереднього шляху
+                common = found
+            else:
+                common = common_prefix_length(path, previous, found)
+            del nodes[common + 1:]
+            node = nodes[-1]
+            count = 0
+            for char in path[common:]:
+                node = child(node, char)
+                if node == -1:
+                    break
+                nodes.append(node)
+            else:
+                count = word_counts[node]
+            previous = path
+        counts[position] = count
+    return counts
+
+
+class CompactNode:
+    """Вузол префіксного дерева без словника атрибутів"""
+
+    __slots__ = ('children', 'value', 'is_end_of_word', 'word_count', 'best_score')
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.is_end_of_word = False
+        # Кількість слів у піддереві цього вузла (включно з ним самим)
+        self.word_count = 0
+        # Найкраща оцінка слова в піддереві (None - немає слів з оцінкою)
+        self.best_score = None
+
+    def copy(self) -> 'CompactNode':
+        """Копія вузла з власним словником дочірніх (самі дочірні спільні)"""
+        node = CompactNode()
+        node.children = dict(self.children)
+        node.value = self.value
+        node.is_end_of_word = self.is_end_of_word
+        node.word_count = self.word_count
+        node.best_score = self.best_score
+        return node
+
+
+class PackedTrie:
+    """
+    Заморожене префіксне дерево у плоских масивах
+
+    edge_start[i]..edge_start[i + 1] - діапазон ребер вузла i;
+    labels[e] - код символу ребра, targets[e] - номер дочірнього вузла;
+    is_end[i], word_counts[i], values[i], best_scores[i] - ознака кінця
+    слова, кількість слів у піддереві, значення вузла і найкраща оцінка
+    слова в піддереві; root - номер кореня.
+    Дочірні вузли завжди мають більші номери за батьківський, якщо
+    root == 0 (пакування в ширину), і менші - якщо корінь останній
+    (побудова з відсортованих ключів).
+    """
+
+    def __init__(self, edge_start, labels, targets, is_end, word_counts, values, best_scores,
+                 root: int = 0, none_value=None):
+        # Значення в values і best_scores, що означає None (для int64-масивів)
+        self.none_value = none_value
+        self.root = root
+        self.edge_start = edge_start
+        self.labels = labels
+        self.targets = targets
+        self.is_end = is_end
+        self.word_counts = word_counts
+        self.values = values
+        # Обчислюються під час побудови, тож дерево зі знімка лише читає їх
+        self.best_scores = best_scores
+        # Буфер (mmap), над яким побудовано масиви, якщо дерево завантажене з файлу
+        self.buffer = None
+
+    @classmethod
+    def from_nodes(cls, root) -> 'PackedTrie':
+        """Пакує дерево змінних вузлів обходом у ширину"""
+        edge_start = array('I', [0])
+        labels = array('I')
+        targets = array('I')
+        is_end = array('B')
+        word_counts = array('I')
+        values = []
+        best_scores = []
+
+        queue = [root]
+        for node in queue:
+            is_end.append(node.is_end_of_word)
+            word_counts.append(node.word_count)
+            values.append(node.value)
+            best_scores.append(node.best_score)
+            for char in sorted(node.children):
+                labels.append(ord(char))
+                targets.append(len(queue))
+                queue.append(node.children[char])
+            edge_start.append(len(labels))
+
+        return cls(edge_start, labels, targets, is_end, word_counts, values, best_scores)
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs, minimize: bool = False) -> Tuple['PackedTrie', int]:
+        """
+        Будує заморожене дерево прямо з відсортованих пар (ключ, значення)
+
+        Кожен ключ продовжує спільний префікс із попереднім; вузол
+        записується в масиви, щойно стає відомо, що нових дочірніх у нього
+        не буде (нумерація у зворотному порядку, корінь - останній).
+        З minimize=True вузол з уже записаною сигнатурою (ознака кінця,
+        значення, ребра) не записується вдруге - виходить мінімальний
+        ациклічний автомат (DAWG). Значення входить у сигнатуру, тож
+        об'єднуються лише піддерева з однаковими значеннями: мінімізація
+        дає ефект для ключів без значень (None) або з частими значеннями.
+
+        Returns:
+            Дерево і кількість вузлів нестисненого дерева без кореня
+            (тобто кількість унікальних префіксів)
+        """
+        edge_start = array('I', [0])
+        labels = array('I')
+        targets = array('I')
+        is_end = array('B')
+        word_counts = array('I')
+        values = []
+        best_scores = []
+        # Сигнатура вузла -> номер уже записаного однакового вузла
+        register = {} if minimize else None
+
+        # Стан вузлів поточного шляху: ребра до завершених дочірніх,
+        # ознака кінця слова, значення і кількість слів на момент входу
+        # (лічильник слів у піддереві - приріст слів, поки вузол на шляху)
+        path_edges = [[]]
+        path_end = [False]
+        path_values = [None]
+        entered = [0]
+        words = 0
+        previous = ''
+        node_count = 0
+
+        def finish(depth: int) -> int:
+            """Записує завершений вузол шляху і повертає його номер"""
+            edges = path_edges[depth]
+            count = words - entered[depth]
+            if register is not None:
+                signature = (path_end[depth], path_values[depth], count, tuple(edges))
+                try:
+                    existing = register.get(signature)
+                except TypeError:
+                    # Нехешоване значення - вузол записується окремо
+                    signature = existing = None
+                if existing is not None:
+                    return existing
+            # Дочірні вузли вже записані, тож їхні оцінки відомі
+            best = score_of(path_values[depth]) if path_end[depth] else None
+            for label, target in edges:
+                labels.append(label)
+                targets.append(target)
+                score = best_scores[target]
+                if score is not None and (best is None or score > best):
+                    best = score
+            edge_start.append(len(labels))
+            is_end.append(path_end[depth])
+            word_counts.append(count)
+            values.append(path_values[depth])
+            best_scores.append(best)
+            index = len(is_end) - 1
+            if register is not None and signature is not None:
+                register[signature] = index
+            return index
+
+        for key, value in pairs:
+            common = common_prefix_length(key, previous, len(previous))
+
+            # Вузли попереднього ключа глибші за спільний префікс завершені
+            for depth in range(len(path_edges) - 1, common, -1):
+                path_edges[depth - 1].append((ord(previous[depth - 1]), finish(depth)))
+            del path_edges[common + 1:]
+            del path_end[common + 1:]
+            del path_values[common + 1:]
+            del entered[common + 1:]
+
+            for _ in range(len(key) - common):
+                path_edges.append([])
+                path_end.append(False)
+                path_values.append(None)
+                entered.append(words)
+            node_count += len(key) - common
+
+            if not path_end[-1]:
+                path_end[-1] = True
+                words += 1
+            path_values[-1] = value
+            previous = key
+
+        for depth in range(len(path_edges) - 1, 0, -1):
+            path_edges[depth - 1].append((ord(previous[depth - 1]), finish(depth)))
+        root = finish(0)
+
+        return cls(edge_start, labels, targets, is_end, word_counts, values, best_scores, root), node_count
+
+    def to_nodes(self) -> CompactNode:
+        """
+        Відновлює дерево змінних вузлів (розморожування); спільні
+        піддерева мінімізованого автомата розгортаються в окремі копії
+        """
+        edge_start = self.edge_start
+        labels = self.labels
+        targets = self.targets
+
+        root = CompactNode()
+        stack = [(self.root, root)]
+        while stack:
+            index, node = stack.pop()
+            node.is_end_of_word = bool(self.is_end[index])
+            node.word_count = self.word_counts[index]
+            node.value = self.value(index)
+            node.best_score = self.best_score(index)
+            for edge in range(edge_start[index], edge_start[index + 1]):
+                child = node.children[chr(labels[edge])] = CompactNode()
+                stack.append((targets[edge], child))
+        return root
+
+    @property
+    def node_count(self) -> int:
+        """Кількість вузлів дерева"""
+        return len(self.is_end)
+
+    def node(self, index: int = None) -> 'PackedNode':
+        """Повертає представлення вузла з заданим номером (за замовчуванням - корінь)"""
+        return PackedNode(self, self.root if index is None else index)
+
+    def value(self, index: int):
+        """Значення вузла з заданим номером (None, якщо його немає)"""
+        value = self.values[index]
+        return None if value == self.none_value else value
+
+    def best_score(self, index: int):
+        """Найкраща оцінка слова в піддереві вузла (None, якщо оцінок немає)"""
+        score = self.best_scores[index]
+        return None if score == self.none_value else score
+
+    def child(self, index: int, char: str) -> int:
+        """Номер дочірнього вузла за символом або -1"""
+        lo = self.edge_start[index]
+        hi = self.edge_start[index + 1]
+        code = ord(char)
+        position = bisect_left(self.labels, code, lo, hi)
+        if position < hi and self.labels[position] == code:
+            return self.targets[position]
+        return -1
+
+    def edges(self, index: int) -> Iterator[Tuple[str, int]]:
+        """Ребра вузла у порядку зростання символів: пари (символ, номер дочірнього вузла)"""
+        labels = self.labels
+        targets = self.targets
+        for edge in range(self.edge_start[index], self.edge_start[index + 1]):
+            yield chr(labels[edge]), targets[edge]
+
+
+class PackedChildren:
+    """Відображення символ → дочірній вузол для вузла PackedTrie (лише читання)"""
+
+    __slots__ = ('_trie', '_index')
+
+    def __init__(self, trie: PackedTrie, index: int):
+        self._trie = trie
+        self._index = index
+
+    def get(self, char: str, default=None):
+        target = self._trie.child(self._index, char)
+        return PackedNode(self._trie, target) if target != -1 else default
+
+    def __getitem__(self, char: str) -> 'PackedNode':
+        target = self._trie.child(self._index, char)
+        if target == -1:
+            raise KeyError(char)
+        return PackedNode(self._trie, target)
+
+    def __contains__(self, char) -> bool:
+        return isinstance(char, str) and len(char) == 1 and self._trie.child(self._index, char) != -1
+
+    def __len__(self) -> int:
+        return self._trie.edge_start[self._index + 1] - self._trie.edge_start[self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return (char for char, _ in self._trie.edges(self._index))
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def values(self) -> List['PackedNode']:
+        return [PackedNode(self._trie, target) for _, target in self._trie.edges(self._index)]
+
+    def items(self) -> List[Tuple[str, 'PackedNode']]:
+        return [(char, PackedNode(self._trie, target)) for char, target in self._trie.edges(self._index)]
+
+
+class PackedNode:
+    """Легке представлення вузла PackedTrie з інтерфейсом CompactNode"""
+
+    __slots__ = ('_trie', '_index')
+
+    def __init__(self, trie: PackedTrie, index: int):
+        self._trie = trie
+        self._index = index
+
+    @property
+    def trie(self) -> PackedTrie:
+        """Заморожене дерево, якому належить вузол"""
+        return self._trie
+
+    @property
+    def children(self) -> PackedChildren:
+        return PackedChildren(self._trie, self._index)
+
+    @property
+    def is_end_of_word(self) -> bool:
+        return bool(self._trie.is_end[self._index])
+
+    @property
+    def value(self):
+        return self._trie.value(self._index)
+
+    @property
+    def word_count(self) -> int:
+        return self._trie.word_counts[self._index]
+
+    @property
+    def best_score(self):
+        return self._trie.best_score(self._index)
+
+
+def _aligned(offset: int) -> int:
+    """Вирівнює зміщення на 8 байтів"""
+    return (offset + 7) & ~7
+
+
+def save_snapshot(path: str, tries: List[Optional[PackedTrie]], metadata: Dict[str, Any]):
+    """
+    Записує заморожені дерева у плаский бінарний файл
+
+    Значення вузлів і найкращі оцінки піддерев зберігаються як int64
+    (None - NONE_VALUE), тож підтримуються лише цілі значення.
+
+    Args:
+        path: шлях до файлу
+        tries: дерева для запису (None - відсутнє дерево)
+        metadata: довільні JSON-сумісні метадані
+
+    Raises:
+        TypeError: якщо значення вузла не є цілим числом чи None
+    """
+    sections = []
+    descriptions = []
+    for trie in tries:
+        if trie is None:
+            descriptions.append(None)
+            continue
+        arrays = {}
+        for name, typecode in SNAPSHOT_ARRAYS:
+            if name in ('values', 'best_scores'):
+                read = trie.value if name == 'values' else trie.best_score
+                try:
+                    data = array('q', (NONE_VALUE if read(i) is None else read(i)
+                                       for i in range(trie.node_count)))
+                except TypeError:
+                    raise TypeError("Знімок підтримує лише цілі значення або None") from None
+            else:
+                data = array(typecode, getattr(trie, name))
+            arrays[name] = data
+        descriptions.append({'root': trie.root, 'lengths': {name: len(data) for name, data in arrays.items()}})
+        sections.append(arrays)
+
+    header = json.dumps({
+        'byteorder': sys.byteorder,
+        'tries': descriptions,
+        'metadata': metadata,
+    }).encode('utf-8')
+
+    with open(path, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(len(header).to_bytes(4, 'little'))
+        file.write(header)
+        offset = len(SNAPSHOT_MAGIC) + 4 + len(header)
+        for arrays in sections:
+            for name, _ in SNAPSHOT_ARRAYS:
+                padding = _aligned(offset) - offset
+                file.write(b'\0' * padding)
+                data = arrays[name].tobytes()
+                file.write(data)
+                offset += padding + len(data)
+
+
+def load_snapshot(path: str, use_mmap: bool = True) -> Tuple[List[Optional[PackedTrie]], Dict[str, Any]]:
+    """
+    Читає файл, записаний save_snapshot
+
+    З use_mmap=True файл відображається в пам'ять, а масиви дерев -
+    це memoryview над відображенням: нічого не десеріалізується, і
+    кілька процесів ділять одну копію через кеш сторінок ОС.
+
+    Returns:
+        Список дерев (None на місці відсутніх) і метадані
+
+    Raises:
+        ValueError: якщо файл не є знімком дерева
+    """
+    with open(path, 'rb') as file:
+        if use_mmap:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = file.read()
+
+    view = memoryview(buffer)
+    magic = bytes(view[:len(SNAPSHOT_MAGIC)])
+    if magic != SNAPSHOT_MAGIC:
+        if magic[:6] == SNAPSHOT_MAGIC[:6]:
+            raise ValueError(f"Знімок {path} записано в іншій версії формату: збережіть дерево повторно")
+        raise ValueError(f"Файл {path} не є знімком префіксного дерева")
+    header_length = int.from_bytes(view[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 4], 'little')
+    offset = len(SNAPSHOT_MAGIC) + 4
+    header = json.loads(bytes(view[offset:offset + header_length]).decode('utf-8'))
+    offset += header_length
+    # Чужий порядок байтів - копіюємо масиви з перестановкою замість відображення
+    swap = header['byteorder'] != sys.byteorder
+
+    tries = []
+    for description in header['tries']:
+        if description is None:
+            tries.append(None)
+            continue
+        arrays = {}
+        for name, typecode in SNAPSHOT_ARRAYS:
+            offset = _aligned(offset)
+            size = description['lengths'][name] * array(typecode).itemsize
+            section = view[offset:offset + size]
+            if swap or not use_mmap:
+                data = array(typecode, bytes(section))
+                if swap:
+                    data.byteswap()
+            else:
+                data = section.cast(typecode)
+            arrays[name] = data
+            offset += size
+        trie = PackedTrie(root=description['root'], none_value=NONE_VALUE, **arrays)
+        # Посилання на відображення тримає його відкритим, поки живе дерево
+        trie.buffer = buffer
+        tries.append(trie)
+
+    return tries, header['metadata']
@@ -0,0 +1,179 @@
+"""
+Потокове завантаження логістичної мережі зі списків ребер CSV / Parquet
+
+Файл читається порціями з обмеженим використанням пам'яті: назви вузлів
+інтернуються в MaxFlowNetwork одразу, ребра потрапляють прямо в масиви
+мережі, а ролі вузлів беруться з явних стовпців, а не з префіксів назв.
+Parquet підтримується, якщо встановлено pyarrow.
+"""
+
+import csv
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from task1 import MaxFlowNetwork, ROLE_TERMINAL, ROLE_STORE
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _parse_number(text: str):
+    """
+    Перетворює рядок на int, а запис з крапкою ("5.0") - на float
+
+    Перевіряє значення add_edge: цілі float приймаються так само, як
+    і з Parquet, а дробові відхиляються з поясненням.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _parse_capacity(value) -> int:
+    """Перетворює значення пропускної здатності з файлу на число"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lower() in ('inf', 'infinity', '∞'):
+            return float('inf')
+        return _parse_number(value)
+    return value
+
+
+def _parse_cost(value) -> int:
+    """Перетворює значення вартості з файлу на число (порожнє - нульова вартість)"""
+    if isinstance(value, str):
+        value = value.strip()
+        return _parse_number(value) if value else 0
+    return 0 if value is None else value
+
+
+def _add_chunk(network: MaxFlowNetwork, from_nodes: Sequence, to_nodes: Sequence, capacities: Sequence,
+               from_roles: Optional[Sequence], to_roles: Optional[Sequence],
+               costs: Optional[Sequence] = None) -> int:
+    """Додає до мережі порцію ребер, заданих окремими стовпцями"""
+    for i in range(len(from_nodes)):
+        cost = _parse_cost(costs[i]) if costs is not None else 0
+        network.add_edge(from_nodes[i], to_nodes[i], _parse_capacity(capacities[i]), cost)
+        if from_roles is not None and from_roles[i]:
+            network.set_node_role(from_nodes[i], from_roles[i])
+        if to_roles is not None and to_roles[i]:
+            network.set_node_role(to_nodes[i], to_roles[i])
+    return len(from_nodes)
+
+
+def _iter_csv_chunks(path: str, columns: List[Optional[str]], chunk_size: int,
+                     delimiter: str) -> Iterator[List[Optional[List]]]:
+    """Читає CSV порціями і повертає для кожної порції список стовпців"""
+    with open(path, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"Файл {path} порожній: очікується рядок заголовка")
+        try:
+            indices = [header.index(column) if column is not None else None for column in columns]
+        except ValueError as error:
+            raise ValueError(f"У файлі {path} немає потрібного стовпця: {error}") from None
+
+        # Рядок має містити всі потрібні стовпці, інакше номер рядка потрапляє в помилку
+        width = max((index for index in indices if index is not None), default=-1) + 1
+        while True:
+            rows = []
+            for row in islice(reader, chunk_size):
+                if len(row) < width:
+                    raise ValueError(f"Файл {path}, рядок {reader.line_num}: очікується щонайменше "
+                                     f"{width} стовпців, отримано {len(row)}")
+                rows.append(row)
+            if not rows:
+                break
+            yield [
+                [row[index] for row in rows] if index is not None else None
+                for index in indices
+            ]
+
+
+def _iter_parquet_chunks(path: str, columns: List[Optional[str]],
+                         chunk_size: int) -> Iterator[List[Optional[List]]]:
+    """Читає Parquet пакетами записів і повертає для кожного пакета список стовпців"""
+    if pq is None:
+        raise ImportError("Для читання Parquet потрібен пакет pyarrow")
+
+    parquet_file = pq.ParquetFile(path)
+    requested = [column for column in columns if column is not None]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=requested):
+        data = batch.to_pydict()
+        yield [data[column] if column is not None else None for column in columns]
+
+
+def load_network(path: str, from_column: str = 'from', to_column: str = 'to',
+                 capacity_column: str = 'capacity', from_role_column: Optional[str] = None,
+                 to_role_column: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 delimiter: str = ',', network: Optional[MaxFlowNetwork] = None,
+                 cost_column: Optional[str] = None) -> MaxFlowNetwork:
+    """
+    Завантажує мережу зі списку ребер у форматі CSV або Parquet
+
+    Формат визначається за розширенням файлу (.parquet / .pq - Parquet,
+    інакше CSV із заголовком). Ролі вузлів ('terminal', 'warehouse',
+    'store') читаються з необов'язкових стовпців from_role_column
+    і to_role_column; порожні значення ролі ігноруються. Вартість
+    перевезення одиниці товару - з необов'язкового стовпця cost_column
+    (порожнє значення - нульова вартість).
+
+    Args:
+        path: шлях до файлу
+        from_column: стовпець початкового вузла
+        to_column: стовпець кінцевого вузла
+        capacity_column: стовпець пропускної здатності ('inf' - без обмеження)
+        from_role_column: стовпець ролі початкового вузла
+        to_role_column: стовпець ролі кінцевого вузла
+        chunk_size: кількість рядків в одній порції
+        delimiter: роздільник CSV
+        network: наявна мережа для доповнення (за замовчуванням - нова)
+        cost_column: стовпець вартості одиниці потоку (ціле число)
+
+    Returns:
+        Мережа з завантаженими ребрами
+
+    Raises:
+        ValueError: якщо CSV порожній чи в рядку бракує стовпців, у файлі
+            немає потрібного стовпця, пропускна здатність дробова, роль
+            невідома або вартість від'ємна
+        ImportError: якщо для Parquet не встановлено pyarrow
+    """
+    if network is None:
+        network = MaxFlowNetwork()
+
+    columns = [from_column, to_column, capacity_column, from_role_column, to_role_column, cost_column]
+    if path.lower().endswith(('.parquet', '.pq')):
+        chunks = _iter_parquet_chunks(path, columns, chunk_size)
+    else:
+        chunks = _iter_csv_chunks(path, columns, chunk_size, delimiter)
+
+    for from_nodes, to_nodes, capacities, from_roles, to_roles, costs in chunks:
+        _add_chunk(network, from_nodes, to_nodes, capacities, from_roles, to_roles, costs)
+
+    return network
+
+
+def connect_super_terminals(network: MaxFlowNetwork, super_source: str = "Супер-джерело",
+                            super_sink: str = "Супер-стік") -> Tuple[str, str]:
+    """
+    З'єднує всі вузли з роллю термінала із супер-джерелом, а всі магазини -
+    із супер-стоком (необмежена пропускна здатність)
+
+    Returns:
+        Назви супер-джерела і супер-стоку
+    """
+    for name in list(network.node_names):
+        role = network.get_node_role(name)
+        if role == ROLE_TERMINAL:
+            network.add_edge(super_source, name, float('inf'))
+        elif role == ROLE_STORE:
+            network.add_edge(name, super_sink, float('inf'))
+    return super_source, super_sink
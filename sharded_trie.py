@@ -0,0 +1,377 @@
+"""
+Префіксне дерево, розподілене між процесами за діапазонами першого символу
+
+Кожен шард - окремий робочий процес зі своїм деревом Homework, тож
+словник не обмежений одним ядром і однією купою процесу. Запити, що
+залежать від префікса (put, get, has_prefix, keys_with_prefix), йдуть
+лише до шарда, якому належить перший символ; слова з заданим суфіксом
+можуть бути в будь-якому шарді, тому такі запити розсилаються всім
+шардам, а результати зливаються. Пакетні операції надсилаються всім
+шардам одночасно, і ті обробляють свої частини паралельно.
+"""
+
+import multiprocessing
+import os
+import string
+from array import array
+from bisect import bisect_right
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from task2 import Homework
+
+
+# Символи, між якими за замовчуванням рівномірно діляться межі шардів:
+# цифри, латиниця і українська абетка в обох регістрах, у порядку кодів
+DEFAULT_ALPHABET = ''.join(sorted(
+    string.digits + string.ascii_letters
+    + 'абвгґдеєжзиіїйклмнопрстуфхцчшщьюя' + 'АБВГҐДЕЄЖЗИІЇЙКЛМНОПРСТУФХЦЧШЩЬЮЯ'
+))
+
+# Скільки пар (ключ, значення) надсилається шарду одним повідомленням під час масової побудови
+STREAM_BATCH_SIZE = 4096
+
+
+def _serve_shard(connection, suffix_index: bool):
+    """
+    Цикл робочого процесу шарда: виконує команди (назва методу, аргументи)
+    над власним деревом і відсилає пару (успіх, результат або виняток)
+    """
+    trie = Homework(suffix_index=suffix_index)
+    while True:
+        name, args = connection.recv()
+        if name is None:
+            break
+        try:
+            result = None
+            if name == 'from_sorted':
+                trie = _build_from_stream(connection, args[0], suffix_index)
+            elif name == 'put_many':
+                for key, value in args[0]:
+                    trie.put(key, value)
+            else:
+                result = getattr(trie, name)
+                if callable(result):
+                    result = result(*args)
+                if isinstance(result, Iterator):
+                    result = list(result)
+        except Exception as error:
+            connection.send((False, error))
+            continue
+        connection.send((True, result))
+    connection.close()
+
+
+def _build_from_stream(connection, minimize: bool, suffix_index: bool) -> Homework:
+    """
+    Будує дерево шарда з пакетів пар, що надходять каналом до маркера None
+
+    Якщо побудова обірвалася помилкою, решта пакетів дочитується, щоб
+    наступні повідомлення каналу знову були командами.
+    """
+    finished = False
+
+    def stream():
+        nonlocal finished
+        while True:
+            batch = connection.recv()
+            if batch is None:
+                finished = True
+                return
+            yield from batch
+
+    try:
+        return Homework.from_sorted(stream(), minimize, suffix_index=suffix_index)
+    except Exception:
+        while not finished:
+            finished = connection.recv() is None
+        raise
+
+
+class ShardedTrie:
+    """
+    Префіксне дерево з шардами в окремих процесах
+
+    Шард i зберігає слова, перший символ яких лежить між boundaries[i - 1]
+    (включно) і boundaries[i] (не включно). Використовується як менеджер
+    контексту, щоб робочі процеси завершилися разом із ним.
+    """
+
+    def __init__(self, boundaries: Optional[Sequence[str]] = None, shards: Optional[int] = None,
+                 suffix_index: bool = False):
+        """
+        Args:
+            boundaries: відсортовані символи, з яких починаються шарди,
+                крім першого (за замовчуванням - рівні частини DEFAULT_ALPHABET;
+                ключі з інших символів потрапляють у крайні шарди)
+            shards: кількість шардів, якщо boundaries не задані
+                (за замовчуванням - кількість ядер)
+            suffix_index: підтримувати індекс суфіксів у шардах
+
+        Raises:
+            ValueError: якщо межі не є різними символами у зростаючому порядку
+        """
+        if boundaries is None:
+            if shards is None:
+                shards = os.cpu_count() or 1
+            alphabet = DEFAULT_ALPHABET
+            boundaries = [alphabet[len(alphabet) * i // shards] for i in range(1, shards)]
+        boundaries = list(boundaries)
+        if any(len(char) != 1 for char in boundaries) or boundaries != sorted(set(boundaries)):
+            raise ValueError("Межі шардів повинні бути різними символами у зростаючому порядку")
+
+        self.boundaries = boundaries
+        self.suffix_index = suffix_index
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        self._connections = []
+        self._processes = []
+        for _ in range(len(boundaries) + 1):
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve_shard, args=(child, suffix_index), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    @classmethod
+    def from_sorted(cls, items: Iterable, shards: Optional[int] = None, minimize: bool = False,
+                    suffix_index: bool = False, boundaries: Optional[Sequence[str]] = None) -> 'ShardedTrie':
+        """
+        Масово будує шардоване дерево з відсортованих ключів
+
+        Ключі йдуть до шардів потоком, пакетами по STREAM_BATCH_SIZE пар, і
+        головний процес не тримає словник цілком: кожен шард будує свою
+        частину Homework.from_sorted, поки головний процес читає ключі
+        наступних шардів. Якщо boundaries не задані, межі вибираються за
+        квантилями ключів, щоб шарди отримали приблизно порівну слів; для
+        цього items має бути послідовністю (список, кортеж) - інший
+        ітератор без boundaries спершу збирається в список.
+
+        Args:
+            items: відсортовані рядки (значення - порядковий номер у всьому
+                потоці, а з minimize=True - None, як у Homework.from_sorted)
+                або пари (ключ, значення)
+            shards: кількість шардів, якщо boundaries не задані
+                (за замовчуванням - кількість ядер)
+            minimize: об'єднувати однакові піддерева в шардах
+            suffix_index: будувати індекс суфіксів
+            boundaries: межі шардів, як у конструкторі
+
+        Returns:
+            Нове дерево
+
+        Raises:
+            TypeError: якщо ключ не є рядком
+            ValueError: якщо ключ порожній, ключі не відсортовані або межі некоректні
+        """
+        if boundaries is None:
+            if not isinstance(items, Sequence):
+                items = list(items)
+            if shards is None:
+                shards = os.cpu_count() or 1
+            boundaries = []
+            for i in range(1, shards):
+                item = items[len(items) * i // shards] if items else ''
+                key = item if isinstance(item, str) else item[0]
+                # Некоректні ключі тут пропускаються - про них повідомить перевірка потоку
+                if isinstance(key, str) and key and (not boundaries or key[0] > boundaries[-1]):
+                    boundaries.append(key[0])
+
+        trie = cls(boundaries, suffix_index=suffix_index)
+        connections = trie._connections
+        for connection in connections:
+            connection.send(('from_sorted', (minimize,)))
+
+        try:
+            batches = [[] for _ in connections]
+            previous = None
+            for position, item in enumerate(items):
+                key, value = (item, None if minimize else position) if isinstance(item, str) else item
+                cls._validate(key, "Ключ")
+                if previous is not None and key < previous:
+                    raise ValueError(f"Ключі не відсортовані: '{key}' після '{previous}'")
+                previous = key
+                shard = trie._shard_of(key)
+                batch = batches[shard]
+                batch.append((key, value))
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    connections[shard].send(batch)
+                    batches[shard] = []
+            for connection, batch in zip(connections, batches):
+                if batch:
+                    connection.send(batch)
+        except BaseException:
+            # Завершуємо потоки шардів, щоб канали знову приймали команди,
+            # і закриваємо дерево - викликач його не отримає
+            for connection in connections:
+                connection.send(None)
+            for connection in connections:
+                connection.recv()
+            trie.close()
+            raise
+
+        for connection in connections:
+            connection.send(None)
+        try:
+            trie._collect()
+        except BaseException:
+            trie.close()
+            raise
+        return trie
+
+    def _shard_of(self, key: str) -> int:
+        """Номер шарда, якому належить непорожній ключ чи префікс"""
+        return bisect_right(self.boundaries, key[0])
+
+    def _call(self, shard: int, name: str, *args) -> Any:
+        """Виконує метод дерева в одному шарді, повторно викидаючи його виняток"""
+        self._connections[shard].send((name, args))
+        ok, result = self._connections[shard].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _broadcast(self, name: str, args: Optional[List[tuple]] = None) -> List[Any]:
+        """
+        Виконує метод у всіх шардах одночасно: спершу розсилає команди,
+        потім збирає відповіді (args - окремі аргументи для кожного шарда)
+        """
+        for shard, connection in enumerate(self._connections):
+            connection.send((name, args[shard] if args is not None else ()))
+        return self._collect()
+
+    def _collect(self) -> List[Any]:
+        """Збирає по одній відповіді від кожного шарда, повторно викидаючи першу помилку"""
+        # Відповіді читаються від усіх шардів, навіть якщо якийсь завершився помилкою,
+        # щоб у каналах не лишилося непрочитаних повідомлень
+        replies = [connection.recv() for connection in self._connections]
+        for ok, result in replies:
+            if not ok:
+                raise result
+        return [result for _, result in replies]
+
+    @staticmethod
+    def _validate(text: str, name: str):
+        """Перевіряє, що ключ чи префікс, за яким вибирається шард, - непорожній рядок"""
+        if not isinstance(text, str):
+            raise TypeError(f"{name} повинен бути рядком")
+
+        if not text:
+            raise ValueError(f"{name} не може бути порожнім")
+
+    @property
+    def size(self) -> int:
+        """Загальна кількість слів у всіх шардах"""
+        return sum(self._broadcast('size'))
+
+    def put(self, key: str, value=None):
+        """Додає слово в шард його першого символу"""
+        self._validate(key, "Ключ")
+        self._call(self._shard_of(key), 'put', key, value)
+
+    def put_many(self, items: Iterable):
+        """
+        Пакетно додає пари (ключ, значення): кожен шард отримує свою
+        частину одним повідомленням і додає її паралельно з іншими
+        """
+        parts = [[] for _ in self._connections]
+        for key, value in items:
+            self._validate(key, "Ключ")
+            parts[self._shard_of(key)].append((key, value))
+        self._broadcast('put_many', [(part,) for part in parts])
+
+    def get(self, key: str):
+        """Повертає значення слова з його шарда"""
+        self._validate(key, "Ключ")
+        return self._call(self._shard_of(key), 'get', key)
+
+    def delete(self, key: str) -> bool:
+        """Видаляє слово з його шарда"""
+        self._validate(key, "Ключ")
+        return self._call(self._shard_of(key), 'delete', key)
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Перевіряє наявність слів з префіксом у шарді першого символу"""
+        self._validate(prefix, "Префікс")
+        return self._call(self._shard_of(prefix), 'has_prefix', prefix)
+
+    def keys_with_prefix(self, prefix: str) -> List[str]:
+        """
+        Повертає слова з префіксом у лексикографічному порядку; порожній
+        префікс означає всі слова (шарди вже впорядковані за діапазонами)
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Префікс повинен бути рядком")
+
+        if not prefix:
+            return [key for keys in self._broadcast('iter_keys_with_prefix', [('',)] * len(self._connections))
+                    for key in keys]
+        return self._call(self._shard_of(prefix), 'iter_keys_with_prefix', prefix)
+
+    def count_words_with_suffix(self, pattern: str) -> int:
+        """Підраховує слова із суфіксом: запит розсилається всім шардам, лічильники додаються"""
+        return sum(self._broadcast('count_words_with_suffix', [(pattern,)] * len(self._connections)))
+
+    def has_prefix_many(self, prefixes: Iterable[str]) -> array:
+        """
+        Пакетний has_prefix: кожен шард отримує лише свої префікси
+
+        Returns:
+            array('B') з 1 для префіксів, з якими є слова, у порядку запитів
+        """
+        prefixes = list(prefixes)
+        positions = [[] for _ in self._connections]
+        for position, prefix in enumerate(prefixes):
+            self._validate(prefix, "Префікс")
+            positions[self._shard_of(prefix)].append(position)
+
+        answers = self._broadcast('has_prefix_many', [([prefixes[position] for position in part],)
+                                                      for part in positions])
+        result = array('B', bytes(len(prefixes)))
+        for part, flags in zip(positions, answers):
+            for position, flag in zip(part, flags):
+                result[position] = flag
+        return result
+
+    def count_suffix_many(self, patterns: Iterable[str]) -> array:
+        """
+        Пакетний count_words_with_suffix: усі шаблони йдуть до всіх шардів,
+        лічильники шардів додаються
+
+        Returns:
+            array('q') з кількістю слів для кожного суфікса, у порядку запитів
+        """
+        patterns = list(patterns)
+        result = array('q', bytes(8 * len(patterns)))
+        for counts in self._broadcast('count_suffix_many', [(patterns,)] * len(self._connections)):
+            for position, count in enumerate(counts):
+                result[position] += count
+        return result
+
+    def close(self):
+        """Завершує робочі процеси шардів"""
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                connection.send((None, ()))
+            connection.close()
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self) -> 'ShardedTrie':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    words = ["apple", "application", "banana", "cat", "catastrophe", "car", "card", "care", "careful"]
+    with ShardedTrie.from_sorted(sorted(words), shards=3) as trie:
+        print(f"Межі шардів: {trie.boundaries}, слів: {trie.size}")
+        print(f"has_prefix('car'): {trie.has_prefix('car')}")
+        print(f"keys_with_prefix('car'): {trie.keys_with_prefix('car')}")
+        print(f"count_words_with_suffix('e'): {trie.count_words_with_suffix('e')}")
+        print(f"has_prefix_many: {list(trie.has_prefix_many(['app', 'bat', 'ca']))}")
+        print(f"count_suffix_many: {list(trie.count_suffix_many(['e', 'at', 'xyz']))}")
@@ -3,116 +3,1182 @@
 
 Реалізація алгоритму Едмондса-Карпа для знаходження максимального потоку 
 в мережі логістики товарів від терміналів до магазинів через склади.
+Для великих мереж доступні також алгоритми Дініца і push-relabel
+через MaxFlowNetwork.solve(). Роботу розв'язувача можна виміряти,
+передавши в нього об'єкт SolverStats. Якщо ребра мають вартість
+перевезення одиниці товару, MaxFlowNetwork.min_cost_max_flow() знаходить
+максимальний потік найменшої вартості.
 """
 
-from collections import defaultdict, deque
-from typing import Dict, List, Tuple, Any
+import copy
+import heapq
+import math
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple, Any
+
+
+# Замінник нескінченної пропускної здатності у цілочисельних масивах
+UNBOUNDED_CAPACITY = 1 << 62
+
+# Алгоритми, доступні через MaxFlowNetwork.solve()
+SOLVERS = ('edmonds_karp', 'dinic', 'push_relabel')
+
+# Ролі вузлів логістичної мережі; індекс ролі зберігається в node_roles
+ROLE_TERMINAL = 'terminal'
+ROLE_WAREHOUSE = 'warehouse'
+ROLE_STORE = 'store'
+NODE_ROLES = (None, ROLE_TERMINAL, ROLE_WAREHOUSE, ROLE_STORE)
+# Вузли без явної ролі впізнаються за початком назви, як і до появи ролей
+ROLE_NAME_PREFIXES = (('Термінал', ROLE_TERMINAL), ('Склад', ROLE_WAREHOUSE), ('Магазин', ROLE_STORE))
+
+
+class SolverStats:
+    """
+    Лічильники роботи розв'язувача максимального потоку
+    
+    Передається в edmonds_karp / solve / main і заповнюється під час
+    роботи; без нього розв'язувач не виконує жодної додаткової роботи.
+    Методи on_bfs і on_augment можна перевизначити в підкласі, щоб
+    отримувати події напряму (наприклад, для журналу чи метрик).
+    """
+    
+    def __init__(self):
+        self.bfs_calls = 0
+        self.augmenting_paths = 0
+        # Значення для кожного пошуку в ширину та кожного збільшувального шляху
+        self.nodes_scanned: List[int] = []
+        self.edges_scanned: List[int] = []
+        self.path_flows: List[int] = []
+        self.path_lengths: List[int] = []
+        # Сумарний час фаз (с): 'solve', 'analysis', 'report'
+        self.phase_times: Dict[str, float] = {}
+    
+    def on_bfs(self, nodes_scanned: int, edges_scanned: int):
+        """Викликається після кожного пошуку в ширину"""
+        self.bfs_calls += 1
+        self.nodes_scanned.append(nodes_scanned)
+        self.edges_scanned.append(edges_scanned)
+    
+    def on_augment(self, path_flow: int, path_length: int):
+        """Викликається після кожного збільшення потоку вздовж шляху"""
+        self.augmenting_paths += 1
+        self.path_flows.append(path_flow)
+        self.path_lengths.append(path_length)
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Додає час виконання блоку до фази name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+    
+    def summary(self) -> Dict[str, Any]:
+        """Підсумки: кількості, сумарні й середні значення та час фаз"""
+        paths = self.augmenting_paths
+        return {
+            'bfs_calls': self.bfs_calls,
+            'augmenting_paths': paths,
+            'nodes_scanned': sum(self.nodes_scanned),
+            'edges_scanned': sum(self.edges_scanned),
+            'total_flow': sum(self.path_flows),
+            'average_path_length': round(sum(self.path_lengths) / paths, 2) if paths else 0,
+            'phase_times': dict(self.phase_times),
+        }
+
+
+def _phase(stats: Optional[SolverStats], name: str):
+    """Вимірювання фази, якщо передано stats, інакше порожній контекст"""
+    return stats.phase(name) if stats is not None else nullcontext()
 
 
 class MaxFlowNetwork:
-    """Клас для реалізації алгоритму максимального потоку"""
+    """
+    Клас для реалізації алгоритму максимального потоку
+
+    Назви вузлів один раз інтернуються в цілі ідентифікатори, а залишковий
+    граф зберігається у плоских масивах (forward star / CSR):
+    head[v] - перше ребро вузла, edge_next[e] - наступне ребро того ж вузла
+    (у порядку додавання),
+    edge_to[e] - кінцевий вузол, capacity[e] і flow[e] - пропускна здатність
+    і потік, cost[e] - вартість одиниці потоку (для зворотного ребра -
+    з протилежним знаком). Пряме ребро e і зворотне e ^ 1 завжди йдуть парою.
+    """
     
     def __init__(self):
-        self.graph = defaultdict(dict)
-        self.original_capacities = defaultdict(dict)
-        self.vertices = set()
+        self.node_ids: Dict[str, int] = {}
+        self.node_names: List[str] = []
+        self.node_roles = array('b')
+        # Гарячі масиви - звичайні списки: читання з array('q') щоразу
+        # створює новий об'єкт int, а список віддає вже наявний
+        self.head: List[int] = []
+        self._tail: List[int] = []
+        self.edge_to: List[int] = []
+        self.edge_next: List[int] = []
+        self.capacity: List[int] = []
+        self.flow: List[int] = []
+        self.cost: List[int] = []
+        # (from_id << 32 | to_id) -> номер прямого ребра
+        self._edge_lookup: Dict[int, int] = {}
+        # Джерело і стік останнього розв'язання - для інкрементних оновлень
+        self.source: Optional[str] = None
+        self.sink: Optional[str] = None
         
-    def add_edge(self, from_node: str, to_node: str, capacity: int):
-        """Додає ребро до графа з заданою пропускною здатністю"""
-        self.graph[from_node][to_node] = capacity
-        self.graph[to_node][from_node] = 0  # Зворотне ребро
-        self.original_capacities[from_node][to_node] = capacity
-        self.vertices.add(from_node)
-        self.vertices.add(to_node)
+    def _intern(self, name: str) -> int:
+        """Повертає ідентифікатор вузла, створюючи його за потреби"""
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = len(self.node_names)
+            self.node_ids[name] = node_id
+            self.node_names.append(name)
+            self.node_roles.append(0)
+            self.head.append(-1)
+            self._tail.append(-1)
+        return node_id
+    
+    @staticmethod
+    def _to_internal_capacity(capacity) -> int:
+        """
+        Переводить пропускну здатність у цілочисельне представлення масиву
         
-    def bfs(self, source: str, sink: str, parent: Dict[str, str]) -> bool:
+        Цілі значення у вигляді float (наприклад, 25.0) приймаються і
+        перетворюються на int; дробові відхиляються, бо потоки рахуються
+        в цілих одиницях.
         """
-        Пошук в ширину для знаходження шляху від джерела до стоку
-        Повертає True, якщо існує шлях від source до sink
+        if capacity == float('inf'):
+            return UNBOUNDED_CAPACITY
+        if capacity < 0:
+            raise ValueError("Пропускна здатність не може бути від'ємною")
+        if capacity != capacity or capacity != int(capacity):
+            raise ValueError("Пропускна здатність повинна бути цілим числом або float('inf')")
+        return int(capacity)
+    
+    @staticmethod
+    def _validate_cost(cost) -> int:
+        """Перевіряє вартість одиниці потоку: невід'ємне ціле число"""
+        if not math.isfinite(cost) or cost != int(cost):
+            raise ValueError("Вартість повинна бути цілим числом (наприклад, у копійках)")
+        if cost < 0:
+            raise ValueError("Вартість не може бути від'ємною")
+        return int(cost)
+    
+    def add_edge(self, from_node: str, to_node: str, capacity: int, cost: int = 0):
         """
-        visited = set()
-        queue = deque([source])
-        visited.add(source)
+        Додає ребро до графа з заданою пропускною здатністю
         
-        while queue:
-            current = queue.popleft()
+        Args:
+            from_node: початковий вузол
+            to_node: кінцевий вузол
+            capacity: пропускна здатність (float('inf') - без обмеження)
+            cost: вартість перевезення одиниці товару ребром
             
-            for neighbor in self.graph[current]:
-                if neighbor not in visited and self.graph[current][neighbor] > 0:
-                    queue.append(neighbor)
-                    visited.add(neighbor)
-                    parent[neighbor] = current
+        Raises:
+            ValueError: якщо пропускна здатність від'ємна чи дробова або
+                вартість від'ємна чи не ціла
+        """
+        internal_capacity = self._to_internal_capacity(capacity)
+        cost = self._validate_cost(cost)
+        u = self._intern(from_node)
+        v = self._intern(to_node)
+        
+        key = u << 32 | v
+        edge = self._edge_lookup.get(key)
+        if edge is not None:
+            # Повторне додавання перезаписує ребро, як і раніше
+            self.capacity[edge] = internal_capacity
+            self.cost[edge] = cost
+            self.cost[edge ^ 1] = -cost
+            self.flow[edge] = 0
+            self.flow[edge ^ 1] = 0
+            return
+        
+        edge = len(self.edge_to)
+        self._edge_lookup[key] = edge
+        
+        # Пряме ребро
+        self.edge_to.append(v)
+        self.edge_next.append(-1)
+        self.capacity.append(internal_capacity)
+        self.flow.append(0)
+        self.cost.append(cost)
+        self._link(u, edge)
+        
+        # Зворотне ребро
+        self.edge_to.append(u)
+        self.edge_next.append(-1)
+        self.capacity.append(0)
+        self.flow.append(0)
+        self.cost.append(-cost)
+        self._link(v, edge + 1)
+    
+    def _link(self, node: int, edge: int):
+        """Додає ребро в кінець списку суміжності вузла"""
+        last = self._tail[node]
+        if last == -1:
+            self.head[node] = edge
+        else:
+            self.edge_next[last] = edge
+        self._tail[node] = edge
+    
+    def set_node_role(self, node: str, role: Optional[str]):
+        """
+        Задає роль вузла (термінал, склад чи магазин), створюючи вузол за потреби
+        
+        Raises:
+            ValueError: якщо роль невідома
+        """
+        if role not in NODE_ROLES:
+            raise ValueError(f"Невідома роль вузла: {role}")
+        self.node_roles[self._intern(node)] = NODE_ROLES.index(role)
+    
+    def get_node_role(self, node: str) -> Optional[str]:
+        """
+        Повертає роль вузла: задану явно, а якщо її немає - визначену за
+        префіксом назви ("Термінал", "Склад", "Магазин"); інакше None
+        """
+        node_id = self.node_ids.get(node)
+        return None if node_id is None else NODE_ROLES[self._role_index(node_id)]
+    
+    def _role_index(self, node_id: int) -> int:
+        """Індекс ролі вузла в NODE_ROLES з урахуванням ролі за назвою"""
+        role = self.node_roles[node_id]
+        if role:
+            return role
+        name = self.node_names[node_id]
+        for prefix, inferred in ROLE_NAME_PREFIXES:
+            if name.startswith(prefix):
+                return NODE_ROLES.index(inferred)
+        return 0
+    
+    @property
+    def has_costs(self) -> bool:
+        """True, якщо хоча б одне ребро має ненульову вартість"""
+        return any(self.cost)
+    
+    @property
+    def total_cost(self) -> int:
+        """Вартість поточного потоку: сума потік × вартість по прямих ребрах"""
+        flow = self.flow
+        cost = self.cost
+        return sum(flow[edge] * cost[edge] for edge in range(0, len(flow), 2) if flow[edge] > 0)
+    
+    @property
+    def vertices(self) -> set:
+        """Множина назв усіх вузлів мережі"""
+        return set(self.node_names)
+    
+    @property
+    def original_capacities(self) -> Dict[str, Dict[str, Any]]:
+        """Початкові пропускні здатності прямих ребер у вигляді словника"""
+        names = self.node_names
+        edge_to = self.edge_to
+        capacities = defaultdict(dict)
+        for edge in range(0, len(edge_to), 2):
+            capacity = self.capacity[edge]
+            if capacity == UNBOUNDED_CAPACITY:
+                capacity = float('inf')
+            capacities[names[edge_to[edge ^ 1]]][names[edge_to[edge]]] = capacity
+        return capacities
+    
+    def capacity_of(self, from_node: str, to_node: str) -> Any:
+        """
+        Початкова пропускна здатність ребра за O(1)
+        
+        Returns:
+            Пропускна здатність (float('inf') - без обмеження) або None,
+            якщо ребра немає в мережі
+        """
+        from_id = self.node_ids.get(from_node)
+        to_id = self.node_ids.get(to_node)
+        if from_id is None or to_id is None:
+            return None
+        edge = self._edge_lookup.get(from_id << 32 | to_id)
+        if edge is None:
+            return None
+        capacity = self.capacity[edge]
+        return float('inf') if capacity == UNBOUNDED_CAPACITY else capacity
+        
+    def copy_with_capacities(self, updates: Dict[Tuple[str, str], Any] = None) -> 'MaxFlowNetwork':
+        """
+        Створює копію мережі для сценарію "що, якщо"
+        
+        Копія має власні вузли, ролі, масиви суміжності, пропускні здатності
+        й потоки (кожен масив копіюється за O(E)), тож зміни копії, зокрема
+        нові ребра, не зачіпають оригінал; потік копії нульовий.
+        
+        Args:
+            updates: нові пропускні здатності наявних ребер {(from, to): capacity}
+            
+        Returns:
+            Нова мережа з оновленими пропускними здатностями
+            
+        Raises:
+            KeyError: якщо ребра з updates немає в мережі
+        """
+        clone = copy.copy(self)
+        clone.node_ids = dict(self.node_ids)
+        clone.node_names = list(self.node_names)
+        clone.node_roles = array(self.node_roles.typecode, self.node_roles)
+        clone.head = list(self.head)
+        clone._tail = list(self._tail)
+        clone.edge_to = list(self.edge_to)
+        clone.edge_next = list(self.edge_next)
+        clone.cost = list(self.cost)
+        clone._edge_lookup = dict(self._edge_lookup)
+        clone.capacity = list(self.capacity)
+        clone.flow = [0] * len(self.flow)
+        
+        for (from_node, to_node), new_capacity in (updates or {}).items():
+            edge = self._edge_lookup.get(self.node_ids[from_node] << 32 | self.node_ids[to_node])
+            if edge is None:
+                raise KeyError(f"Ребро {from_node} → {to_node} відсутнє в мережі")
+            clone.capacity[edge] = self._to_internal_capacity(new_capacity)
+        
+        return clone
+    
+    def _resolve_terminals(self, source: str, sink: str) -> Tuple[Optional[int], Optional[int]]:
+        """Запам'ятовує джерело і стік розв'язання та повертає їхні ідентифікатори"""
+        self.source = source
+        self.sink = sink
+        return self.node_ids.get(source), self.node_ids.get(sink)
+    
+    @property
+    def flow_value(self) -> int:
+        """Поточна величина потоку: сумарний вихідний потік з джерела"""
+        source_id = self.node_ids.get(self.source)
+        if source_id is None:
+            return 0
+        total = 0
+        edge = self.head[source_id]
+        while edge != -1:
+            total += self.flow[edge]
+            edge = self.edge_next[edge]
+        return total
+    
+    def _bfs(self, source: int, sink: int, parent_edge: List[int],
+             stats: Optional[SolverStats] = None) -> List[int]:
+        """
+        Пошук в ширину для знаходження шляху від джерела до стоку
+        Заповнює parent_edge ребрами, якими досягнуто кожен вузол
+        (шлях існує, якщо parent_edge[sink] != -1), і повертає список
+        відвіданих вузлів: лише їх треба скинути перед наступним пошуком
+        """
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        
+        parent_edge[source] = -2
+        queue = [source]
+        
+        # Список з індексом замість deque: без зайвих виділень пам'яті
+        for current in queue:
+            edge = head[current]
+            while edge != -1:
+                neighbor = edge_to[edge]
+                if parent_edge[neighbor] == -1 and capacity[edge] > flow[edge]:
+                    parent_edge[neighbor] = edge
                     if neighbor == sink:
-                        return True
-        return False
+                        if stats is not None:
+                            self._report_scan(stats, queue, current, edge)
+                        queue.append(neighbor)
+                        return queue
+                    queue.append(neighbor)
+                edge = edge_next[edge]
+        if stats is not None:
+            self._report_scan(stats, queue, None, -1)
+        return queue
     
-    def edmonds_karp(self, source: str, sink: str) -> int:
+    def _report_scan(self, stats: SolverStats, queue: List[int], last: Optional[int], last_edge: int):
+        """
+        Передає в stats кількість вузлів і ребер, переглянутих пошуком
+        
+        Рахується вже після пошуку за чергою та місцем зупинки, тож
+        гарячий цикл _bfs не має лічильників.
+        """
+        scanned = queue[:queue.index(last) + 1] if last is not None else queue
+        edges = 0
+        for node in scanned:
+            edge = self.head[node]
+            while edge != -1:
+                edges += 1
+                if edge == last_edge:
+                    break
+                edge = self.edge_next[edge]
+        stats.on_bfs(len(scanned), edges)
+    
+    def edmonds_karp(self, source: str, sink: str, stats: Optional[SolverStats] = None) -> int:
         """
         Алгоритм Едмондса-Карпа для знаходження максимального потоку
+        
+        Args:
+            source: назва джерела
+            sink: назва стоку
+            stats: необов'язкові лічильники пошуків і збільшувальних шляхів
         """
-        parent = {}
+        source_id, sink_id = self._resolve_terminals(source, sink)
+        if source_id is None or sink_id is None or source_id == sink_id:
+            return 0
+        
+        capacity = self.capacity
+        flow = self.flow
+        edge_to = self.edge_to
         max_flow = 0
         
+        parent_edge = [-1] * len(self.node_names)
+        
         # Поки існує шлях від джерела до стоку
-        while self.bfs(source, sink, parent):
-            # Знаходимо мінімальну пропускну здатність на шляху
-            path_flow = float('Inf')
-            s = sink
-            path = []
+        while True:
+            visited = self._bfs(source_id, sink_id, parent_edge, stats)
+            if parent_edge[sink_id] == -1:
+                break
             
-            # Відновлюємо шлях від стоку до джерела
-            while s != source:
-                path.append((parent[s], s))
-                path_flow = min(path_flow, self.graph[parent[s]][s])
-                s = parent[s]
+            # Знаходимо мінімальну залишкову пропускну здатність на шляху
+            path_flow = UNBOUNDED_CAPACITY
+            v = sink_id
+            while v != source_id:
+                edge = parent_edge[v]
+                residual = capacity[edge] - flow[edge]
+                if residual < path_flow:
+                    path_flow = residual
+                v = edge_to[edge ^ 1]
             
             # Додаємо знайдений потік до загального потоку
             max_flow += path_flow
             
-            # Оновлюємо залишкові пропускні здатності
-            v = sink
-            while v != source:
-                u = parent[v]
-                self.graph[u][v] -= path_flow
-                self.graph[v][u] += path_flow
-                v = parent[v]
-                
-            parent.clear()
+            # Оновлюємо потоки на прямих і зворотних ребрах
+            v = sink_id
+            while v != source_id:
+                edge = parent_edge[v]
+                flow[edge] += path_flow
+                flow[edge ^ 1] -= path_flow
+                v = edge_to[edge ^ 1]
+            
+            if stats is not None:
+                length = 0
+                v = sink_id
+                while v != source_id:
+                    length += 1
+                    v = edge_to[parent_edge[v] ^ 1]
+                stats.on_augment(path_flow, length)
+            
+            # Скидаються лише вузли, відвідані цим пошуком, а не весь масив
+            for node in visited:
+                parent_edge[node] = -1
+            
+        return max_flow
+    
+    def _bfs_levels(self, source: int, sink: int) -> List[int]:
+        """
+        Будує граф рівнів для алгоритму Дініца: відстань у ребрах від
+        джерела по залишковому графу (-1 для недосяжних вузлів)
+        """
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        
+        level = [-1] * len(self.node_names)
+        level[source] = 0
+        queue = [source]
+        
+        for current in queue:
+            next_level = level[current] + 1
+            # Вузли, глибші за сток, у блокуючому потоці не потрібні
+            if level[sink] != -1 and next_level > level[sink]:
+                break
+            edge = head[current]
+            while edge != -1:
+                neighbor = edge_to[edge]
+                if level[neighbor] == -1 and capacity[edge] > flow[edge]:
+                    level[neighbor] = next_level
+                    queue.append(neighbor)
+                edge = edge_next[edge]
+        return level
+    
+    def dinic(self, source: str, sink: str) -> int:
+        """
+        Алгоритм Дініца: граф рівнів і блокуючий потік з покажчиками
+        поточних дуг, O(V²·E)
+        """
+        source_id, sink_id = self._resolve_terminals(source, sink)
+        if source_id is None or sink_id is None or source_id == sink_id:
+            return 0
+        
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        max_flow = 0
+        
+        while True:
+            level = self._bfs_levels(source_id, sink_id)
+            if level[sink_id] == -1:
+                break
             
+            # Покажчики поточних дуг: кожне ребро фази переглядається один раз
+            current_arc = list(head)
+            path = []
+            v = source_id
+            
+            while True:
+                if v == sink_id:
+                    # Проштовхуємо потік уздовж знайденого шляху
+                    path_flow = UNBOUNDED_CAPACITY
+                    for edge in path:
+                        residual = capacity[edge] - flow[edge]
+                        if residual < path_flow:
+                            path_flow = residual
+                    saturated = -1
+                    for index, edge in enumerate(path):
+                        flow[edge] += path_flow
+                        flow[edge ^ 1] -= path_flow
+                        if saturated == -1 and capacity[edge] == flow[edge]:
+                            saturated = index
+                    max_flow += path_flow
+                    
+                    # Відкочуємося до першого насиченого ребра
+                    del path[saturated:]
+                    v = edge_to[path[-1]] if path else source_id
+                    continue
+                
+                edge = current_arc[v]
+                next_level = level[v] + 1
+                while edge != -1:
+                    if capacity[edge] > flow[edge] and level[edge_to[edge]] == next_level:
+                        break
+                    edge = edge_next[edge]
+                current_arc[v] = edge
+                
+                if edge != -1:
+                    path.append(edge)
+                    v = edge_to[edge]
+                elif v == source_id:
+                    break
+                else:
+                    # Глухий кут: вилучаємо вузол із графа рівнів
+                    level[v] = -1
+                    edge = path.pop()
+                    v = edge_to[edge ^ 1]
+                    current_arc[v] = edge_next[edge]
+        
         return max_flow
     
+    def _global_relabel(self, source: int, sink: int, height: List[int]):
+        """
+        Глобальне перемаркування для push-relabel: точні відстані до стоку
+        по залишковому графу, а для решти вузлів - n + відстань до джерела
+        """
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        node_count = len(height)
+        
+        for v in range(node_count):
+            height[v] = 2 * node_count
+        
+        for root, base in ((sink, 0), (source, node_count)):
+            height[root] = base
+            queue = [root]
+            for current in queue:
+                next_height = height[current] + 1
+                edge = head[current]
+                while edge != -1:
+                    neighbor = edge_to[edge]
+                    # Ребро neighbor -> current має залишкову пропускну здатність
+                    if height[neighbor] == 2 * node_count and capacity[edge ^ 1] > flow[edge ^ 1]:
+                        height[neighbor] = next_height
+                        queue.append(neighbor)
+                    edge = edge_next[edge]
+    
+    def push_relabel(self, source: str, sink: str) -> int:
+        """
+        Алгоритм проштовхування передпотоку з вибором найвищої мітки,
+        евристикою розриву (gap) і періодичним глобальним перемаркуванням
+        """
+        source_id, sink_id = self._resolve_terminals(source, sink)
+        if source_id is None or sink_id is None or source_id == sink_id:
+            return 0
+        
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        node_count = len(self.node_names)
+        max_height = 2 * node_count
+        
+        height = [0] * node_count
+        excess = [0] * node_count
+        
+        # Насичуємо всі ребра з джерела
+        edge = head[source_id]
+        while edge != -1:
+            residual = capacity[edge] - flow[edge]
+            if residual > 0:
+                flow[edge] += residual
+                flow[edge ^ 1] -= residual
+                excess[edge_to[edge]] += residual
+                excess[source_id] -= residual
+            edge = edge_next[edge]
+        
+        def rebuild():
+            """Глобальне перемаркування і перебудова кошиків активних вузлів"""
+            self._global_relabel(source_id, sink_id, height)
+            height[source_id] = node_count
+            current_arc[:] = head
+            buckets[:] = [[] for _ in range(max_height + 1)]
+            count[:] = [0] * (max_height + 1)
+            highest = 0
+            for v in range(node_count):
+                count[height[v]] += 1
+                if excess[v] > 0 and v != source_id and v != sink_id:
+                    buckets[height[v]].append(v)
+                    if height[v] > highest:
+                        highest = height[v]
+            return highest
+        
+        current_arc = list(head)
+        buckets: List[List[int]] = []
+        count: List[int] = []
+        highest = rebuild()
+        relabels = 0
+        
+        while highest >= 0:
+            bucket = buckets[highest]
+            if not bucket:
+                highest -= 1
+                continue
+            v = bucket.pop()
+            if height[v] != highest or excess[v] == 0:
+                continue
+            
+            # Розвантаження вузла v
+            while excess[v] > 0 and height[v] < max_height:
+                edge = current_arc[v]
+                if edge == -1:
+                    # Перемаркування: піднімаємо v над найнижчим сусідом
+                    old_height = height[v]
+                    new_height = max_height
+                    edge = head[v]
+                    while edge != -1:
+                        if capacity[edge] > flow[edge] and height[edge_to[edge]] + 1 < new_height:
+                            new_height = height[edge_to[edge]] + 1
+                        edge = edge_next[edge]
+                    count[old_height] -= 1
+                    height[v] = new_height
+                    count[new_height] += 1
+                    current_arc[v] = head[v]
+                    relabels += 1
+                    
+                    # Евристика розриву: вузли над порожнім рівнем відрізані від стоку
+                    if count[old_height] == 0 and old_height < node_count:
+                        for u in range(node_count):
+                            if old_height < height[u] < node_count:
+                                count[height[u]] -= 1
+                                height[u] = node_count + 1
+                                count[node_count + 1] += 1
+                                current_arc[u] = head[u]
+                                if excess[u] > 0 and u != v:
+                                    buckets[node_count + 1].append(u)
+                                    if node_count + 1 > highest:
+                                        highest = node_count + 1
+                    continue
+                
+                neighbor = edge_to[edge]
+                residual = capacity[edge] - flow[edge]
+                if residual > 0 and height[v] == height[neighbor] + 1:
+                    delta = excess[v] if excess[v] < residual else residual
+                    flow[edge] += delta
+                    flow[edge ^ 1] -= delta
+                    excess[v] -= delta
+                    if excess[neighbor] == 0 and neighbor != source_id and neighbor != sink_id:
+                        buckets[height[neighbor]].append(neighbor)
+                        if height[neighbor] > highest:
+                            highest = height[neighbor]
+                    excess[neighbor] += delta
+                    if residual == delta:
+                        current_arc[v] = edge_next[edge]
+                else:
+                    current_arc[v] = edge_next[edge]
+            
+            # Періодичне глобальне перемаркування
+            if relabels >= node_count:
+                relabels = 0
+                highest = rebuild()
+        
+        return excess[sink_id]
+    
+    def solve(self, source: str, sink: str, algorithm: str = 'edmonds_karp',
+              stats: Optional[SolverStats] = None) -> int:
+        """
+        Єдина точка входу для пошуку максимального потоку
+        
+        Args:
+            source: назва джерела
+            sink: назва стоку
+            algorithm: 'edmonds_karp', 'dinic' або 'push_relabel'
+            stats: необов'язкові лічильники; час записується у фазу 'solve',
+                пошуки й шляхи - для алгоритму Едмондса-Карпа
+            
+        Returns:
+            Величина потоку, доданого до поточного залишкового стану
+            
+        Raises:
+            ValueError: якщо алгоритм невідомий
+        """
+        if algorithm not in SOLVERS:
+            raise ValueError(f"Невідомий алгоритм: {algorithm}. Доступні: {', '.join(SOLVERS)}")
+        with _phase(stats, 'solve'):
+            if algorithm == 'edmonds_karp':
+                return self.edmonds_karp(source, sink, stats)
+            return getattr(self, algorithm)(source, sink)
+    
+    def _reduced_distances(self, source: int, potential: List[int]) -> List[int]:
+        """
+        Дейкстра по залишковому графу зі зведеними вартостями
+        cost[e] + potential[u] - potential[v] (невід'ємні завдяки потенціалам);
+        повертає відстані від source (None для недосяжних вузлів)
+        """
+        head = self.head
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        cost = self.cost
+        
+        distance = [None] * len(self.node_names)
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            current_distance, current = heapq.heappop(heap)
+            if current_distance > distance[current]:
+                continue
+            base = current_distance + potential[current]
+            edge = head[current]
+            while edge != -1:
+                if capacity[edge] > flow[edge]:
+                    neighbor = edge_to[edge]
+                    candidate = base + cost[edge] - potential[neighbor]
+                    if distance[neighbor] is None or candidate < distance[neighbor]:
+                        distance[neighbor] = candidate
+                        heapq.heappush(heap, (candidate, neighbor))
+                edge = edge_next[edge]
+        return distance
+    
+    def _push_admissible(self, source: int, sink: int, potential: List[int], current_arc: List[int]) -> int:
+        """
+        Шукає в глибину шлях з source у sink по ребрах нульової зведеної
+        вартості (найкоротших за вартістю) і проштовхує ним потік.
+        Повертає проштовхнутий обсяг або 0, якщо такого шляху немає
+        """
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        cost = self.cost
+        
+        visited = bytearray(len(self.node_names))
+        visited[source] = 1
+        path = []
+        current = source
+        while current != sink:
+            edge = current_arc[current]
+            while edge != -1:
+                neighbor = edge_to[edge]
+                if (not visited[neighbor] and capacity[edge] > flow[edge]
+                        and cost[edge] + potential[current] == potential[neighbor]):
+                    break
+                edge = edge_next[edge]
+            current_arc[current] = edge
+            
+            if edge == -1:
+                # Глухий кут: повертаємося і переходимо до наступного ребра батьківського вузла
+                if not path:
+                    return 0
+                current = edge_to[path.pop() ^ 1]
+                current_arc[current] = edge_next[current_arc[current]]
+                continue
+            
+            visited[neighbor] = 1
+            path.append(edge)
+            current = neighbor
+        
+        pushed = min(capacity[edge] - flow[edge] for edge in path)
+        for edge in path:
+            flow[edge] += pushed
+            flow[edge ^ 1] -= pushed
+        return pushed
+    
+    def min_cost_max_flow(self, source: str, sink: str) -> Tuple[int, int]:
+        """
+        Максимальний потік найменшої вартості: послідовні найкоротші шляхи
+        (Дейкстра з потенціалами) з проштовхуванням потоку всіма шляхами
+        однакової вартості за одну фазу (primal-dual)
+        
+        Вартості невід'ємні, тож початкові потенціали нульові, а після
+        кожного пошуку потенціал вузла збільшується на його відстань -
+        зведені вартості лишаються невід'ємними. Розв'язання починається з
+        нульового потоку: поточний потік мережі скидається.
+        
+        Args:
+            source: назва джерела
+            sink: назва стоку
+            
+        Returns:
+            Величина максимального потоку і його вартість
+        """
+        source_id, sink_id = self._resolve_terminals(source, sink)
+        self.flow[:] = [0] * len(self.flow)
+        if source_id is None or sink_id is None or source_id == sink_id:
+            return 0, 0
+        
+        potential = [0] * len(self.node_names)
+        max_flow = 0
+        total_cost = 0
+        while True:
+            distance = self._reduced_distances(source_id, potential)
+            if distance[sink_id] is None:
+                break
+            # Недосяжні вузли лишаються недосяжними: потік лише насичує ребра,
+            # а нові зворотні ребра з'являються тільки між досяжними вузлами
+            for node, node_distance in enumerate(distance):
+                if node_distance is not None:
+                    potential[node] += node_distance
+            
+            # Вартість одиниці потоку будь-яким найкоротшим шляхом у цій фазі
+            path_cost = potential[sink_id] - potential[source_id]
+            current_arc = list(self.head)
+            while True:
+                pushed = self._push_admissible(source_id, sink_id, potential, current_arc)
+                if not pushed:
+                    break
+                max_flow += pushed
+                total_cost += pushed * path_cost
+        
+        return max_flow, total_cost
+    
+    def _augment(self, start: int, end: int, limit: int) -> int:
+        """
+        Проштовхує до limit одиниць потоку від start до end по залишковому
+        графу найкоротшими шляхами. Повертає фактично проштовхнутий обсяг
+        """
+        capacity = self.capacity
+        flow = self.flow
+        edge_to = self.edge_to
+        pushed = 0
+        
+        parent_edge = [-1] * len(self.node_names)
+        while pushed < limit:
+            visited = self._bfs(start, end, parent_edge)
+            if parent_edge[end] == -1:
+                break
+            
+            path_flow = limit - pushed
+            v = end
+            while v != start:
+                edge = parent_edge[v]
+                residual = capacity[edge] - flow[edge]
+                if residual < path_flow:
+                    path_flow = residual
+                v = edge_to[edge ^ 1]
+            
+            v = end
+            while v != start:
+                edge = parent_edge[v]
+                flow[edge] += path_flow
+                flow[edge ^ 1] -= path_flow
+                v = edge_to[edge ^ 1]
+            pushed += path_flow
+            
+            for node in visited:
+                parent_edge[node] = -1
+        
+        return pushed
+    
+    def update_capacity(self, from_node: str, to_node: str, new_capacity: int) -> int:
+        """
+        Змінює пропускну здатність ребра, зберігаючи поточний залишковий стан
+        
+        При збільшенні пропускної здатності потік лише доповнюється від
+        наявного. При зменшенні надлишок потоку на ребрі скасовується
+        локально: спершу перенаправляється обхідними шляхами, а решта
+        повертається до джерела і знімається зі стоку.
+        
+        Args:
+            from_node: початковий вузол ребра
+            to_node: кінцевий вузол ребра
+            new_capacity: нова пропускна здатність
+            
+        Returns:
+            Величина максимального потоку після зміни (0, якщо мережу ще не розв'язували)
+            
+        Raises:
+            ValueError: якщо пропускна здатність від'ємна
+        """
+        internal_capacity = self._to_internal_capacity(new_capacity)
+        u = self.node_ids.get(from_node)
+        v = self.node_ids.get(to_node)
+        edge = None
+        if u is not None and v is not None:
+            edge = self._edge_lookup.get(u << 32 | v)
+        
+        if edge is None:
+            self.add_edge(from_node, to_node, new_capacity)
+        else:
+            overflow = self.flow[edge] - internal_capacity
+            self.capacity[edge] = internal_capacity
+            
+            if overflow > 0:
+                # Скасовуємо надлишковий потік на самому ребрі
+                self.flow[edge] -= overflow
+                self.flow[edge ^ 1] += overflow
+                
+                # Надлишок у u і нестачу у v спершу пробуємо з'єднати обхідним шляхом
+                overflow -= self._augment(u, v, overflow)
+                
+                if overflow > 0:
+                    source_id = self.node_ids[self.source]
+                    sink_id = self.node_ids[self.sink]
+                    if u != source_id:
+                        self._augment(u, source_id, overflow)
+                    if v != sink_id:
+                        self._augment(sink_id, v, overflow)
+        
+        if self.source is None:
+            return 0
+        
+        # Доповнюємо потік від поточного стану, а не з нуля
+        self.dinic(self.source, self.sink)
+        return self.flow_value
+    
+    def decompose_flow(self) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        Точний розклад поточного потоку на шляхи від джерела до стоку
+        
+        Один прохід з покажчиками поточних дуг: кожне ребро вичерпується
+        не більше одного разу, тож складність O(E·кількість шляхів).
+        Цикли потоку, якщо вони трапляються, скасовуються на льоту.
+        Якщо потік не зберігається у вузлах (наприклад, add_edge перезаписав
+        ребро вже розв'язаної мережі), потік, що не доходить до стоку,
+        у розклад не потрапляє.
+        
+        Returns:
+            Список пар (шлях як кортеж назв вузлів, потік уздовж шляху);
+            для збереженого потоку сума дорівнює величині потоку мережі
+        """
+        source_id = self.node_ids.get(self.source)
+        sink_id = self.node_ids.get(self.sink)
+        if source_id is None or sink_id is None or source_id == sink_id:
+            return []
+        
+        edge_next = self.edge_next
+        edge_to = self.edge_to
+        names = self.node_names
+        remaining = list(self.flow)
+        current_arc = list(self.head)
+        # Позиція вузла в поточному шляху (-1, якщо вузол не на шляху)
+        position = [-1] * len(names)
+        
+        paths = []
+        path_nodes = [source_id]
+        path_edges = []
+        position[source_id] = 0
+        
+        while True:
+            v = path_nodes[-1]
+            
+            if v == sink_id:
+                path_flow = min(remaining[edge] for edge in path_edges)
+                for edge in path_edges:
+                    remaining[edge] -= path_flow
+                paths.append((tuple(names[node] for node in path_nodes), path_flow))
+                for node in path_nodes:
+                    position[node] = -1
+                path_nodes = [source_id]
+                path_edges = []
+                position[source_id] = 0
+                continue
+            
+            # Наступне ребро з невичерпаним потоком
+            edge = current_arc[v]
+            while edge != -1 and remaining[edge] <= 0:
+                edge = edge_next[edge]
+            current_arc[v] = edge
+            
+            if edge == -1:
+                if v == source_id:
+                    break
+                # Вузол без вихідного потоку можливий лише за порушеного збереження
+                # потоку: залишок вхідного ребра нікуди не веде, тож відкидаємо
+                # його, інакше батьківський вузол знову вибрав би це ребро
+                position[v] = -1
+                path_nodes.pop()
+                remaining[path_edges.pop()] = 0
+                continue
+            
+            w = edge_to[edge]
+            if position[w] != -1:
+                # Знайдено цикл потоку: скасовуємо його і повертаємося до w
+                cycle = path_edges[position[w]:] + [edge]
+                cycle_flow = min(remaining[e] for e in cycle)
+                for e in cycle:
+                    remaining[e] -= cycle_flow
+                for node in path_nodes[position[w] + 1:]:
+                    position[node] = -1
+                del path_nodes[position[w] + 1:]
+                del path_edges[position[w]:]
+                continue
+            
+            position[w] = len(path_nodes)
+            path_nodes.append(w)
+            path_edges.append(edge)
+        
+        return paths
+    
+    def min_cut(self, what_if: bool = False, delta: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Мінімальний розріз за залишковим графом після розв'язання
+        
+        Один BFS від джерела по ребрах із залишковою пропускною здатністю
+        відділяє досяжні вузли (бік джерела) від решти (бік стоку).
+        Ребра між ними - саме ті, що обмежують потік.
+        
+        Args:
+            what_if: якщо True, оцінює для кожного ребра розрізу приріст
+                потоку від збільшення його пропускної здатності
+            delta: на скільки збільшувати пропускну здатність у режимі
+                what_if (None - без обмеження)
+            
+        Returns:
+            Словник з ребрами розрізу, їхньою сумарною пропускною здатністю,
+            множинами вузлів обох боків і, за потреби, рейтингом what_if
+            
+        Raises:
+            ValueError: якщо мережу ще не розв'язували
+        """
+        if self.source is None or self.sink is None:
+            raise ValueError("Мінімальний розріз визначається після розв'язання: спершу викличте solve()")
+        
+        source_id = self.node_ids.get(self.source)
+        names = self.node_names
+        node_count = len(names)
+        
+        reachable = [-1] * node_count
+        if source_id is not None:
+            self._bfs(source_id, -1, reachable)
+        
+        edge_to = self.edge_to
+        cut = []
+        cut_capacity = 0
+        for edge in range(0, len(edge_to), 2):
+            if reachable[edge_to[edge ^ 1]] != -1 and reachable[edge_to[edge]] == -1:
+                capacity = self.capacity[edge]
+                cut.append(edge)
+                cut_capacity += capacity
+        
+        def external(value):
+            return float('inf') if value >= UNBOUNDED_CAPACITY else value
+        
+        result = {
+            'cut_edges': [
+                ((names[edge_to[edge ^ 1]], names[edge_to[edge]]), external(self.capacity[edge]))
+                for edge in cut
+            ],
+            'cut_capacity': external(cut_capacity),
+            'source_side': {names[v] for v in range(node_count) if reachable[v] != -1},
+            'sink_side': {names[v] for v in range(node_count) if reachable[v] == -1},
+        }
+        
+        if what_if:
+            result['what_if'] = self._rank_cut_edges(cut, delta)
+        
+        return result
+    
+    def _rank_cut_edges(self, cut: List[int], delta: Optional[int]) -> List[Tuple[Tuple[str, str], Any]]:
+        """
+        Оцінює приріст потоку для кожного ребра розрізу без повного
+        перерозв'язання: пропускна здатність тимчасово збільшується,
+        потік доповнюється від поточного стану, після чого стан відновлюється
+        """
+        source_id = self.node_ids.get(self.source)
+        sink_id = self.node_ids.get(self.sink)
+        if source_id is None or sink_id is None:
+            # Джерела чи стоку немає в мережі - розріз порожній, оцінювати нічого
+            return []
+        names = self.node_names
+        edge_to = self.edge_to
+        capacity = self.capacity
+        flow = self.flow
+        saved_flow = list(flow)
+        
+        ranking = []
+        for edge in cut:
+            original = capacity[edge]
+            capacity[edge] = UNBOUNDED_CAPACITY if delta is None else min(original + delta, UNBOUNDED_CAPACITY)
+            gain = self._augment(source_id, sink_id, UNBOUNDED_CAPACITY)
+            capacity[edge] = original
+            flow[:] = saved_flow
+            
+            # Залишок ребра без обмеження - UNBOUNDED_CAPACITY мінус його потік,
+            # тож необмежений приріст трохи менший за саму константу
+            if gain >= UNBOUNDED_CAPACITY // 2:
+                gain = float('inf')
+            ranking.append(((names[edge_to[edge ^ 1]], names[edge_to[edge]]), gain))
+        
+        ranking.sort(key=lambda item: item[1], reverse=True)
+        return ranking
+    
     def get_flow_analysis(self) -> Dict[str, Any]:
-        """Повертає детальний аналіз потоків у мережі"""
+        """Повертає детальний аналіз потоків у мережі разом із загальною вартістю потоку"""
         flows = {}
         terminal_flows = {}
         store_flows = {}
         
-        # Аналізуємо потоки між усіма вузлами
-        for from_node in self.original_capacities:
-            for to_node in self.original_capacities[from_node]:
-                original_capacity = self.original_capacities[from_node][to_node]
-                remaining_capacity = self.graph[from_node][to_node]
-                flow = original_capacity - remaining_capacity
+        names = self.node_names
+        role_of = self._role_index
+        terminal = NODE_ROLES.index(ROLE_TERMINAL)
+        store = NODE_ROLES.index(ROLE_STORE)
+        edge_to = self.edge_to
+        flow_array = self.flow
+        
+        # Аналізуємо потоки на прямих ребрах
+        for edge in range(0, len(edge_to), 2):
+            flow = flow_array[edge]
+            
+            if flow > 0:
+                from_id = edge_to[edge ^ 1]
+                to_id = edge_to[edge]
+                from_node = names[from_id]
+                to_node = names[to_id]
+                flows[(from_node, to_node)] = flow
                 
-                if flow > 0:
-                    flows[(from_node, to_node)] = flow
-                    
-                    # Збираємо потоки від терміналів
-                    if from_node.startswith('Термінал'):
-                        if from_node not in terminal_flows:
-                            terminal_flows[from_node] = 0
-                        terminal_flows[from_node] += flow
-                    
-                    # Збираємо потоки до магазинів
-                    if to_node.startswith('Магазин'):
-                        if to_node not in store_flows:
-                            store_flows[to_node] = 0
-                        store_flows[to_node] += flow
+                # Збираємо потоки від терміналів
+                if role_of(from_id) == terminal:
+                    if from_node not in terminal_flows:
+                        terminal_flows[from_node] = 0
+                    terminal_flows[from_node] += flow
+                
+                # Збираємо потоки до магазинів
+                if role_of(to_id) == store:
+                    if to_node not in store_flows:
+                        store_flows[to_node] = 0
+                    store_flows[to_node] += flow
         
         return {
             'flows': flows,
             'terminal_flows': terminal_flows,
-            'store_flows': store_flows
+            'store_flows': store_flows,
+            'total_cost': self.total_cost
         }
 
 
@@ -140,6 +1206,8 @@ def create_logistics_network():
     
     for from_terminal, to_warehouse, capacity in terminal_warehouse_connections:
         network.add_edge(from_terminal, to_warehouse, capacity)
+        network.set_node_role(from_terminal, ROLE_TERMINAL)
+        network.set_node_role(to_warehouse, ROLE_WAREHOUSE)
     
     # Зв'язки від складів до магазинів
     warehouse_store_connections = [
@@ -161,6 +1229,7 @@ def create_logistics_network():
     
     for from_warehouse, to_store, capacity in warehouse_store_connections:
         network.add_edge(from_warehouse, to_store, capacity)
+        network.set_node_role(to_store, ROLE_STORE)
     
     # З'єднуємо магазини з супер-стоком (необмежена пропускна здатність)
     stores = [f"Магазин {i}" for i in range(1, 15)]
@@ -170,34 +1239,35 @@ def create_logistics_network():
     return network, super_source, super_sink
 
 
-def calculate_terminal_to_store_flow(network: MaxFlowNetwork, terminal: str, store: str, flows: Dict[Tuple[str, str], int]) -> int:
-    """Обчислює потік від конкретного терміналу до конкретного магазину"""
-    # Простий підхід: якщо потік йде через склад, розподіляємо пропорційно
-    total_flow = 0
+def summarize_path_flows(network: MaxFlowNetwork, paths: List[Tuple[Tuple[str, ...], int]]) -> Dict[str, Dict]:
+    """
+    Зводить розклад потоку на шляхи в потоки термінал → магазин
+    і підсумки по терміналах та магазинах за один прохід
+    """
+    terminal_store_flows = {}
+    terminal_flows = {}
+    store_flows = {}
     
-    # Знаходимо всі склади, через які проходить потік від терміналу
-    terminal_warehouse_flows = {}
-    for (from_node, to_node), flow in flows.items():
-        if from_node == terminal and to_node.startswith('Склад'):
-            terminal_warehouse_flows[to_node] = flow
-    
-    # Для кожного складу обчислюємо, скільки йде до нашого магазину
-    for warehouse, terminal_to_warehouse_flow in terminal_warehouse_flows.items():
-        if (warehouse, store) in flows:
-            warehouse_to_store_flow = flows[(warehouse, store)]
-            
-            # Обчислюємо загальний потік з цього складу
-            total_warehouse_output = sum(
-                flow for (from_w, to_s), flow in flows.items() 
-                if from_w == warehouse and to_s.startswith('Магазин')
-            )
-            
-            if total_warehouse_output > 0:
-                # Пропорційно розподіляємо потік від терміналу
-                proportion = warehouse_to_store_flow / total_warehouse_output
-                total_flow += int(terminal_to_warehouse_flow * proportion)
-    
-    return total_flow
+    for path, flow in paths:
+        terminal = next((node for node in path if network.get_node_role(node) == ROLE_TERMINAL), None)
+        store = next((node for node in reversed(path) if network.get_node_role(node) == ROLE_STORE), None)
+        
+        if terminal is not None:
+            terminal_flows[terminal] = terminal_flows.get(terminal, 0) + flow
+        if store is not None:
+            store_flows[store] = store_flows.get(store, 0) + flow
+        if terminal is not None and store is not None:
+            terminal_store_flows[(terminal, store)] = terminal_store_flows.get((terminal, store), 0) + flow
+    
+    # Порядок додавання вузлів до мережі: Термінал 1, 2, ... / Магазин 1, 2, ...
+    order = network.node_ids
+    return {
+        'terminal_store_flows': dict(sorted(
+            terminal_store_flows.items(), key=lambda item: (order[item[0][0]], order[item[0][1]])
+        )),
+        'terminal_flows': dict(sorted(terminal_flows.items(), key=lambda item: order[item[0]])),
+        'store_flows': dict(sorted(store_flows.items(), key=lambda item: order[item[0]])),
+    }
 
 
 def find_bottleneck_routes(network: MaxFlowNetwork) -> List[Tuple[Tuple[str, str], int]]:
@@ -205,9 +1275,9 @@ def find_bottleneck_routes(network: MaxFlowNetwork) -> List[Tuple[Tuple[str, str
     bottlenecks = []
     min_capacity = float('inf')
     
-    for from_node in network.original_capacities:
-        for to_node in network.original_capacities[from_node]:
-            capacity = network.original_capacities[from_node][to_node]
+    # Словник будується один раз на весь обхід
+    for from_node, targets in network.original_capacities.items():
+        for to_node, capacity in targets.items():
             if capacity < min_capacity and capacity != float('inf'):
                 min_capacity = capacity
                 bottlenecks = [((from_node, to_node), capacity)]
@@ -223,21 +1293,42 @@ def identify_bottlenecks(network: MaxFlowNetwork, flows: Dict[Tuple[str, str], i
     
     # Знаходимо ребра, які використовуються на повну потужність
     for (from_node, to_node), flow in flows.items():
-        original_capacity = network.original_capacities[from_node][to_node]
+        original_capacity = network.capacity_of(from_node, to_node)
         if flow == original_capacity and original_capacity != float('inf'):
             bottlenecks.append(f"{from_node} → {to_node} (повністю завантажено: {flow}/{original_capacity})")
     
     return bottlenecks
 
 
-def analyze_results(network: MaxFlowNetwork, max_flow: int):
-    """Аналізує результати та створює звіт"""
-    analysis = network.get_flow_analysis()
+def analyze_results(network: MaxFlowNetwork, max_flow: int, stats: Optional[SolverStats] = None):
+    """
+    Аналізує результати та створює звіт
+    
+    Усі обчислення виконуються до друку, тож час аналізу і звіту
+    записується в stats окремими фазами 'analysis' і 'report'.
+    """
+    with _phase(stats, 'analysis'):
+        analysis = network.get_flow_analysis()
+        # Точний розклад потоку на шляхи - єдине джерело для таблиці та підсумків
+        path_summary = summarize_path_flows(network, network.decompose_flow())
+        min_capacity_routes = find_bottleneck_routes(network)
+        bottlenecks = identify_bottlenecks(network, analysis['flows'])
+        cut = network.min_cut(what_if=True, delta=10)
     
+    total_cost = analysis['total_cost'] if network.has_costs else None
+    with _phase(stats, 'report'):
+        _print_report(max_flow, path_summary, min_capacity_routes, bottlenecks, cut, total_cost)
+
+
+def _print_report(max_flow: int, path_summary: Dict[str, Dict], min_capacity_routes: List,
+                  bottlenecks: List[str], cut: Dict[str, Any], total_cost: Optional[int] = None):
+    """Друкує звіт з уже обчислених результатів аналізу (вартість - лише для мереж з вартостями)"""
     print(f"\n{'='*60}")
     print(f"ЗВІТ ПРО МАКСИМАЛЬНИЙ ПОТІК У ЛОГІСТИЧНІЙ МЕРЕЖІ")
     print(f"{'='*60}")
     print(f"Максимальний потік: {max_flow} одиниць товару")
+    if total_cost is not None:
+        print(f"Загальна вартість перевезень: {total_cost}")
     print(f"{'='*60}")
     
     # Створюємо таблицю потоків між терміналами та магазинами
@@ -246,25 +1337,19 @@ def analyze_results(network: MaxFlowNetwork, max_flow: int):
     print(f"{'Термінал':<15} {'Магазин':<15} {'Фактичний Потік (одиниць)':<25}")
     print("-" * 60)
     
-    for terminal in ['Термінал 1', 'Термінал 2']:
-        for store in [f'Магазин {i}' for i in range(1, 15)]:
-            # Обчислюємо потік від терміналу до магазину через склади
-            terminal_to_store_flow = calculate_terminal_to_store_flow(
-                network, terminal, store, analysis['flows']
-            )
-            if terminal_to_store_flow > 0:
-                print(f"{terminal:<15} {store:<15} {terminal_to_store_flow:<25}")
+    for (terminal, store), terminal_to_store_flow in path_summary['terminal_store_flows'].items():
+        print(f"{terminal:<15} {store:<15} {terminal_to_store_flow:<25}")
     
     # Аналіз потоків по терміналах
     print(f"\n\nАНАЛІЗ ПОТОКІВ ПО ТЕРМІНАЛАХ:")
     print("-" * 40)
-    for terminal, flow in analysis['terminal_flows'].items():
+    for terminal, flow in path_summary['terminal_flows'].items():
         print(f"{terminal}: {flow} одиниць")
     
     # Аналіз потоків по магазинах
     print(f"\nАНАЛІЗ ПОСТАЧАННЯ ПО МАГАЗИНАХ:")
     print("-" * 40)
-    for store, flow in sorted(analysis['store_flows'].items()):
+    for store, flow in sorted(path_summary['store_flows'].items()):
         print(f"{store}: {flow} одиниць")
     
     # Відповіді на аналітичні питання
@@ -272,41 +1357,116 @@ def analyze_results(network: MaxFlowNetwork, max_flow: int):
     print("=" * 50)
     
     # 1. Які термінали забезпечують найбільший потік
-    max_terminal_flow = max(analysis['terminal_flows'].values())
-    top_terminals = [t for t, f in analysis['terminal_flows'].items() if f == max_terminal_flow]
-    print(f"1. Термінали з найбільшим потоком ({max_terminal_flow} одиниць): {', '.join(top_terminals)}")
+    if path_summary['terminal_flows']:
+        max_terminal_flow = max(path_summary['terminal_flows'].values())
+        top_terminals = [t for t, f in path_summary['terminal_flows'].items() if f == max_terminal_flow]
+        print(f"1. Термінали з найбільшим потоком ({max_terminal_flow} одиниць): {', '.join(top_terminals)}")
+    else:
+        print("1. Потік не проходить через жоден термінал")
     
     # 2. Маршрути з найменшою пропускною здатністю
-    min_capacity_routes = find_bottleneck_routes(network)
     print(f"2. Маршрути з найменшою пропускною здатністю:")
     for route, capacity in min_capacity_routes:
         print(f"   {route[0]} → {route[1]}: {capacity} одиниць")
     
     # 3. Магазини з найменшим постачанням
-    min_store_flow = min(analysis['store_flows'].values())
-    min_stores = [s for s, f in analysis['store_flows'].items() if f == min_store_flow]
-    print(f"3. Магазини з найменшим постачанням ({min_store_flow} одиниць): {', '.join(min_stores)}")
+    if path_summary['store_flows']:
+        min_store_flow = min(path_summary['store_flows'].values())
+        min_stores = [s for s, f in path_summary['store_flows'].items() if f == min_store_flow]
+        print(f"3. Магазини з найменшим постачанням ({min_store_flow} одиниць): {', '.join(min_stores)}")
+    else:
+        print("3. Потік не доходить до жодного магазину")
     
     # 4. Вузькі місця
-    bottlenecks = identify_bottlenecks(network, analysis['flows'])
     print(f"4. Виявлені вузькі місця:")
     for bottleneck in bottlenecks:
         print(f"   {bottleneck}")
+    
+    # 5. Мінімальний розріз: ребра, що справді обмежують потік
+    cut_capacities = dict(cut['cut_edges'])
+    print(f"5. Мінімальний розріз (пропускна здатність {cut['cut_capacity']} одиниць):")
+    for (from_node, to_node), gain in cut['what_if']:
+        capacity = cut_capacities[(from_node, to_node)]
+        print(f"   {from_node} → {to_node}: {capacity} одиниць, +10 одиниць дають приріст потоку {gain}")
 
 
-def main():
-    """Основна функція програми"""
+def main(stats: Optional[SolverStats] = None):
+    """
+    Основна функція програми
+    
+    Args:
+        stats: необов'язкові лічильники розв'язувача і час фаз
+            'solve', 'analysis', 'report'
+    """
     print("Створення мережі логістики товарів...")
     network, source, sink = create_logistics_network()
     
     print("Застосування алгоритму Едмондса-Карпа...")
-    max_flow = network.edmonds_karp(source, sink)
+    with _phase(stats, 'solve'):
+        max_flow = network.edmonds_karp(source, sink, stats)
     
     print("Аналіз результатів...")
-    analyze_results(network, max_flow)
+    analyze_results(network, max_flow, stats)
     
     return network, max_flow
 
 
 if __name__ == "__main__":
-    network, max_flow = main()
\ No newline at end of file
+    network, max_flow = main()
+    
+    # Усі алгоритми знаходять однаковий максимальний потік
+    for algorithm in SOLVERS:
+        fresh, source, sink = create_logistics_network()
+        assert fresh.solve(source, sink, algorithm) == max_flow == 115
+    
+    # Інкрементне оновлення пропускної здатності збігається з повним
+    # перерозв'язанням: спершу збільшення, потім зменшення
+    for capacity, expected in ((35, 125), (5, 95)):
+        scenario = network.copy_with_capacities({("Термінал 1", "Склад 1"): capacity})
+        assert scenario.solve(network.source, network.sink) == expected
+        assert network.update_capacity("Термінал 1", "Склад 1", capacity) == expected
+    
+    # Зміни копії сценарію (нове ребро, роль) не зачіпають базову мережу
+    base, source, sink = create_logistics_network()
+    base.solve(source, sink)
+    scenario = base.copy_with_capacities()
+    assert scenario.update_capacity("Термінал 2", "Магазин 1", 50) == 165
+    scenario.set_node_role("Склад 1", ROLE_STORE)
+    assert base.capacity_of("Термінал 2", "Магазин 1") is None
+    assert base.get_node_role("Склад 1") == ROLE_WAREHOUSE
+    assert base.solve(source, sink) == 0 and base.flow_value == 115
+    
+    # Розклад на шляхи відтворює потік на кожному ребрі, а сума шляхів - весь потік
+    paths = network.decompose_flow()
+    assert sum(flow for _, flow in paths) == network.flow_value == 95
+    path_edge_flows = defaultdict(int)
+    for path, flow in paths:
+        for route in zip(path, path[1:]):
+            path_edge_flows[route] += flow
+    assert path_edge_flows == network.get_flow_analysis()['flows']
+    
+    # Перезаписане після розв'язання ребро порушує збереження потоку: розклад
+    # відкидає потік Термінал 1 → Склад 1 (25), що тепер нікуди не веде, і не зациклюється
+    broken, source, sink = create_logistics_network()
+    broken.edmonds_karp(source, sink)
+    broken.add_edge("Термінал 1", "Склад 1", 25)
+    assert sum(flow for _, flow in broken.decompose_flow()) == 90
+    
+    # Пропускна здатність мінімального розрізу дорівнює максимальному потоку
+    cut = network.min_cut()
+    assert cut['cut_capacity'] == network.flow_value
+    assert sum(capacity for _, capacity in cut['cut_edges']) == cut['cut_capacity']
+    try:
+        MaxFlowNetwork().min_cut(what_if=True)
+        assert False, "min_cut() до розв'язання має викидати ValueError"
+    except ValueError:
+        pass
+    
+    # Потік найменшої вартості: 4 + 15 за виходи з джерела, a → t і b → t по 1
+    # за одиницю, і лише одна одиниця a → b (інакше вартість 28)
+    priced = MaxFlowNetwork()
+    for from_node, to_node, capacity, cost in [("s", "a", 4, 1), ("s", "b", 3, 5), ("a", "t", 3, 1),
+                                               ("a", "b", 2, 1), ("b", "t", 5, 1)]:
+        priced.add_edge(from_node, to_node, capacity, cost)
+    assert priced.min_cost_max_flow("s", "t") == (7, 27)
+    assert priced.total_cost == 27
\ No newline at end of file
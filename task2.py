@@ -4,13 +4,430 @@
 Реалізація додаткових методів для класу Trie:
 - count_words_with_suffix(pattern) - підрахунок слів, що закінчуються заданим шаблоном
 - has_prefix(prefix) - перевірка наявності слів із заданим префіксом
+- top_k_with_prefix(prefix, k) - k слів із префіксом з найбільшими значеннями
+- fuzzy_keys(query, max_distance) - слова в межах відстані Левенштейна від запиту
 """
 
+import heapq
+import os
+import tempfile
+import threading
+from array import array
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
 from trie import Trie
+from compact_trie import CompactNode, PackedTrie, count_paths, load_snapshot, save_snapshot, score_of
 
 
 class Homework(Trie):
-    """Розширений клас Trie з додатковим функціоналом"""
+    """
+    Розширений клас Trie з додатковим функціоналом
+    
+    Вузли зберігаються як CompactNode (__slots__). Після масового
+    завантаження дерево можна заморозити (freeze) у плоскі масиви
+    PackedTrie; операції читання працюють з обома представленнями,
+    а зміна замороженого дерева спершу автоматично його розморожує.
+    
+    У конкурентному режимі (concurrent=True) опубліковані вузли ніколи
+    не змінюються: записувач під блокуванням копіює шлях від кореня до
+    ключа, змінює копії і одним присвоєнням публікує новий корінь.
+    Читачі не блокуються - кожен запит читає корінь один раз і працює
+    з незмінним знімком дерева. Корені дерева та індексу суфіксів і
+    статистика публікуються окремо, тож запит, що поєднує їх, може на
+    мить побачити стан до і після одного запису.
+    """
+    
+    def __init__(self, suffix_index: bool = False, concurrent: bool = False):
+        """
+        Args:
+            suffix_index: підтримувати дерево обернених ключів для швидких
+                запитів за суфіксом (приблизно подвоює пам'ять на ключ, тому
+                вимкнено за замовчуванням; без нього запити за суфіксом
+                обходять усі слова)
+            concurrent: копіювання шляху при записі для читання без
+                блокувань з інших потоків
+        """
+        super().__init__()
+        self.root = CompactNode()
+        self.size = 0
+        # Дерево обернених ключів: вузол на шляху s[::-1] знає, скільки слів закінчуються на s
+        self._suffix_root = CompactNode() if suffix_index else None
+        self._frozen = False
+        self._concurrent = concurrent
+        # Записувачі конкурентного дерева виконуються по черзі; читачі блокування не беруть
+        self._write_lock = threading.Lock() if concurrent else nullcontext()
+        
+        # Агрегати статистики, що оновлюються при кожній зміні
+        self._total_characters = 0
+        self._node_count = 0
+        self._length_histogram = {}
+        self._shortest_word = None
+        self._longest_word = None
+    
+    @classmethod
+    def from_sorted(cls, items, minimize: bool = False, suffix_index: bool = False,
+                    concurrent: bool = False) -> 'Homework':
+        """
+        Масово будує дерево з відсортованого потоку ключів
+        
+        Ключі потоком пишуться прямо в заморожене представлення PackedTrie:
+        кожен ключ продовжує спільний префікс із попереднім, а об'єкти
+        вузлів не створюються взагалі. З minimize=True однакові піддерева
+        об'єднуються на льоту (мінімальний ациклічний автомат, DAWG).
+        Значення є частиною вузла, тому об'єднуються лише піддерева з
+        однаковими значеннями: мінімізація призначена для словників без
+        значень, і рядки в цьому режимі зберігаються зі значенням None.
+        Результат заморожений; перший put/delete розгортає його в дерево.
+        
+        Args:
+            items: відсортовані рядки (значенням стає порядковий номер, як
+                у put(word, i), а з minimize=True - None) або пари (ключ,
+                значення); для однакових ключів лишається останнє значення
+            minimize: об'єднувати однакові піддерева
+            suffix_index: будувати індекс суфіксів
+            concurrent: конкурентний режим (див. опис класу)
+            
+        Returns:
+            Нове дерево
+            
+        Raises:
+            TypeError: якщо ключ не є рядком
+            ValueError: якщо ключ порожній або ключі не відсортовані
+        """
+        trie = cls(suffix_index=suffix_index, concurrent=concurrent)
+        reversed_keys = [] if suffix_index else None
+        
+        def validated():
+            previous = None
+            for position, item in enumerate(items):
+                # Унікальні номери зробили б кожен вузол унікальним і звели нанівець мінімізацію
+                key, value = (item, None if minimize else position) if isinstance(item, str) else item
+                trie._validate_key(key)
+                if previous is not None and key < previous:
+                    raise ValueError(f"Ключі не відсортовані: '{key}' після '{previous}'")
+                if key != previous:
+                    trie.size += 1
+                    trie._record_word(key, 1)
+                    if reversed_keys is not None:
+                        reversed_keys.append(key[::-1])
+                previous = key
+                yield key, value
+        
+        main, trie._node_count = PackedTrie.from_sorted_pairs(validated(), minimize)
+        trie.root = main.node()
+        if reversed_keys is not None:
+            reversed_keys.sort()
+            suffix, _ = PackedTrie.from_sorted_pairs(((key, None) for key in reversed_keys), minimize)
+            trie._suffix_root = suffix.node()
+        
+        trie._frozen = True
+        return trie
+    
+    @staticmethod
+    def _validate_key(key):
+        """Перевіряє, що ключ - непорожній рядок"""
+        if not isinstance(key, str):
+            raise TypeError("Ключ повинен бути рядком")
+        
+        if not key:
+            raise ValueError("Ключ не може бути порожнім")
+    
+    @property
+    def is_frozen(self) -> bool:
+        """True, якщо дерево заморожене в плоскі масиви"""
+        return self._frozen
+    
+    @property
+    def is_concurrent(self) -> bool:
+        """True, якщо дерево працює в конкурентному режимі з копіюванням шляху"""
+        return self._concurrent
+    
+    def freeze(self) -> 'Homework':
+        """
+        Пакує дерево (та індекс суфіксів) у плоскі масиви PackedTrie
+        
+        Returns:
+            Це ж дерево - для ланцюжкових викликів
+        """
+        with self._write_lock:
+            if not self._frozen:
+                self.root = PackedTrie.from_nodes(self.root).node()
+                if self._suffix_root is not None:
+                    self._suffix_root = PackedTrie.from_nodes(self._suffix_root).node()
+                self._frozen = True
+        return self
+    
+    def thaw(self):
+        """Відновлює змінні вузли із замороженого представлення"""
+        with self._write_lock:
+            self._thaw()
+    
+    def _thaw(self):
+        """Розморожування без блокування (викликається записувачами під ним)"""
+        if self._frozen:
+            self.root = self.root.trie.to_nodes()
+            if self._suffix_root is not None:
+                self._suffix_root = self._suffix_root.trie.to_nodes()
+            self._frozen = False
+    
+    def save(self, path: str):
+        """
+        Зберігає дерево, індекс суфіксів і статистику у плаский бінарний файл
+        
+        Саме дерево не змінюється: незаморожене пакується в тимчасову копію.
+        Корені, ознака заморожування і статистика читаються разом під
+        блокуванням записувачів, тож знімок відповідає одній версії дерева;
+        пакування і запис файлу відбуваються вже без блокування (у
+        конкурентному режимі опубліковані вузли не змінюються).
+        
+        Raises:
+            TypeError: якщо серед значень є не цілі числа (крім None)
+        """
+        with self._write_lock:
+            root = self.root
+            suffix_root = self._suffix_root
+            frozen = self._frozen
+            metadata = {
+                'size': self.size,
+                'total_characters': self._total_characters,
+                'node_count': self._node_count,
+                'length_histogram': list(self._length_histogram.items()),
+                'shortest_word': self._shortest_word,
+                'longest_word': self._longest_word,
+            }
+        
+        def packed(node):
+            if node is None:
+                return None
+            return node.trie if frozen else PackedTrie.from_nodes(node)
+        
+        save_snapshot(path, [packed(root), packed(suffix_root)], metadata)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, concurrent: bool = False) -> 'Homework':
+        """
+        Завантажує дерево, збережене методом save
+        
+        З mmap=True файл відображається в пам'ять, і запити (get,
+        has_prefix, count_words_with_suffix, перелік ключів) читають
+        масиви прямо з відображення без десеріалізації; робочі процеси,
+        що завантажили той самий файл, ділять одну копію в кеші сторінок.
+        З concurrent=True дерево працює в конкурентному режимі (див. опис класу).
+        
+        Returns:
+            Заморожене дерево
+        """
+        (main, suffix), metadata = load_snapshot(path, use_mmap=mmap)
+        
+        trie = cls(suffix_index=suffix is not None, concurrent=concurrent)
+        trie.root = main.node()
+        if suffix is not None:
+            trie._suffix_root = suffix.node()
+        trie._frozen = True
+        
+        trie.size = metadata['size']
+        trie._total_characters = metadata['total_characters']
+        trie._node_count = metadata['node_count']
+        trie._length_histogram = dict(metadata['length_histogram'])
+        trie._shortest_word = metadata['shortest_word']
+        trie._longest_word = metadata['longest_word']
+        return trie
+    
+    def _path_nodes(self, key: str) -> list:
+        """Повертає вузли шляху від кореня до key або None, якщо key не є словом"""
+        current = self.root
+        path = [current]
+        for char in key:
+            current = current.children.get(char)
+            if current is None:
+                return None
+            path.append(current)
+        return path if current.is_end_of_word else None
+    
+    def put(self, key, value=None):
+        """
+        Додає слово зі значенням, оновлюючи лічильники слів у піддеревах
+        та індекс суфіксів
+        
+        Raises:
+            TypeError: якщо key не є рядком
+            ValueError: якщо key порожній
+        """
+        self._validate_key(key)
+        with self._write_lock:
+            self._thaw()
+            
+            # У конкурентному режимі шлях копіюється, опубліковані вузли не змінюються
+            copy = self._concurrent
+            current = root = self.root.copy() if copy else self.root
+            path = [current]
+            for char in key:
+                child = current.children.get(char)
+                if child is None:
+                    child = current.children[char] = CompactNode()
+                    self._node_count += 1
+                elif copy:
+                    child = current.children[char] = child.copy()
+                current = child
+                path.append(current)
+            
+            if not current.is_end_of_word:
+                current.is_end_of_word = True
+                for node in path:
+                    node.word_count += 1
+                self.size += 1
+                self._record_word(key, 1)
+                if self._suffix_root is not None:
+                    self._update_suffix_index(key, 1)
+            
+            current.value = value
+            self._update_best_scores(path)
+            self.root = root
+    
+    def delete(self, key) -> bool:
+        """
+        Видаляє слово, оновлюючи лічильники та індекс суфіксів і
+        відрізаючи гілки, в яких не лишилося слів
+        
+        Returns:
+            True, якщо слово було видалено
+            
+        Raises:
+            TypeError: якщо key не є рядком
+            ValueError: якщо key порожній
+        """
+        self._validate_key(key)
+        with self._write_lock:
+            self._thaw()
+            
+            path = self._path_nodes(key)
+            if path is None:
+                return False
+            
+            if self._concurrent:
+                # Змінюємо копії вузлів шляху, зв'язані між собою
+                path = [node.copy() for node in path]
+                for depth, char in enumerate(key):
+                    path[depth].children[char] = path[depth + 1]
+            
+            path[-1].is_end_of_word = False
+            path[-1].value = None
+            for node in path:
+                node.word_count -= 1
+            
+            # Відрізаємо найвищий вузол шляху, у піддереві якого не лишилося слів
+            for depth in range(1, len(path)):
+                if path[depth].word_count == 0:
+                    del path[depth - 1].children[key[depth - 1]]
+                    self._node_count -= len(path) - depth
+                    break
+            
+            self._update_best_scores(path)
+            self.size -= 1
+            if self._suffix_root is not None:
+                self._update_suffix_index(key, -1)
+            self.root = path[0]
+            # Після публікації кореня: новий представник шукається вже без key
+            self._record_word(key, -1)
+        return True
+    
+    @staticmethod
+    def _update_best_scores(path: list):
+        """
+        Перераховує найкращі оцінки піддерев знизу вгору вздовж шляху
+        
+        Вузол залежить лише від власного значення і оцінок дочірніх, тож
+        щойно оцінка вузла не змінилася, вище підніматися не потрібно.
+        """
+        for node in reversed(path):
+            best = score_of(node.value) if node.is_end_of_word else None
+            for child in node.children.values():
+                score = child.best_score
+                if score is not None and (best is None or score > best):
+                    best = score
+            if best == node.best_score:
+                break
+            node.best_score = best
+    
+    def _record_word(self, key: str, delta: int):
+        """Оновлює агрегати статистики при додаванні (1) чи видаленні (-1) слова"""
+        length = len(key)
+        self._total_characters += delta * length
+        # Читачі конкурентного дерева можуть саме обходити гістограму - замінюємо її копією
+        histogram = dict(self._length_histogram) if self._concurrent else self._length_histogram
+        count = histogram.get(length, 0) + delta
+        if count:
+            histogram[length] = count
+        else:
+            del histogram[length]
+        self._length_histogram = histogram
+        
+        # Найкоротше і найдовше слово завжди актуальні (None - лише для
+        # порожнього дерева): читачі get_statistics нічого не дообчислюють
+        if delta > 0:
+            if self._shortest_word is None or length < len(self._shortest_word):
+                self._shortest_word = key
+            if self._longest_word is None or length > len(self._longest_word):
+                self._longest_word = key
+        else:
+            # Нового представника шукаємо, лише коли видалено саме його
+            if key == self._shortest_word:
+                self._shortest_word = self._find_word_of_length(min(histogram)) if histogram else None
+            if key == self._longest_word:
+                self._longest_word = self._find_word_of_length(max(histogram)) if histogram else None
+    
+    def _find_word_of_length(self, length: int) -> str:
+        """
+        Шукає будь-яке слово заданої довжини, не спускаючись глибше за неї
+        
+        Викликається записувачем під блокуванням і лише тоді, коли видалено
+        поточне найкоротше чи найдовше слово.
+        """
+        stack = [(self.root, '')]
+        while stack:
+            node, word = stack.pop()
+            if len(word) == length:
+                if node.is_end_of_word:
+                    return word
+                continue
+            for char, child in node.children.items():
+                stack.append((child, word + char))
+        return None
+    
+    def _update_suffix_index(self, key: str, delta: int):
+        """
+        Додає (delta=1) або вилучає (delta=-1) слово з дерева обернених ключів,
+        оновлюючи лічильники на шляху і видаляючи вузли без слів
+        """
+        copy = self._concurrent
+        current = root = self._suffix_root.copy() if copy else self._suffix_root
+        current.word_count += delta
+        for char in reversed(key):
+            child = current.children.get(char)
+            if child is None:
+                child = current.children[char] = CompactNode()
+            elif copy:
+                child = current.children[char] = child.copy()
+            child.word_count += delta
+            if child.word_count == 0:
+                # Решта шляху належала лише цьому слову
+                del current.children[char]
+                break
+            current = child
+        else:
+            current.is_end_of_word = delta > 0
+        self._suffix_root = root
+    
+    def _find_suffix_node(self, pattern: str):
+        """Повертає вузол дерева обернених ключів для суфікса або None"""
+        current = self._suffix_root
+        for char in reversed(pattern):
+            current = current.children.get(char)
+            if current is None:
+                return None
+        return current
     
     def count_words_with_suffix(self, pattern: str) -> int:
         """
@@ -33,16 +450,13 @@ class Homework(Trie):
         if not pattern:
             raise ValueError("Шаблон не може бути порожнім")
         
-        # Отримуємо всі ключі з Trie
-        all_keys = self.keys()
-        
-        # Підраховуємо слова, що закінчуються на заданий суфікс
-        count = 0
-        for key in all_keys:
-            if key.endswith(pattern):
-                count += 1
+        # З індексом суфіксів відповідь - лічильник вузла, O(len(pattern))
+        if self._suffix_root is not None:
+            node = self._find_suffix_node(pattern)
+            return node.word_count if node is not None else 0
         
-        return count
+        # Без індексу рахуємо слова на льоту, не будуючи списку ключів
+        return sum(1 for _ in self.iter_words_with_suffix(pattern))
     
     def has_prefix(self, prefix: str) -> bool:
         """
@@ -65,97 +479,404 @@ class Homework(Trie):
         if not prefix:
             raise ValueError("Префікс не може бути порожнім")
         
-        # Ефективна перевірка наявності префікса
+        # Лічильник слів у піддереві вузла префікса дає відповідь за O(len(prefix))
+        return self._count_prefix(prefix) > 0
+    
+    def count_words_with_prefix(self, prefix: str) -> int:
+        """
+        Підраховує кількість слів, що починаються заданим префіксом
+        
+        Args:
+            prefix: префікс для пошуку
+            
+        Returns:
+            Кількість слів із заданим префіксом
+            
+        Raises:
+            TypeError: якщо prefix не є рядком
+            ValueError: якщо prefix порожній
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Префікс повинен бути рядком")
+        
+        if not prefix:
+            raise ValueError("Префікс не може бути порожнім")
+        
+        return self._count_prefix(prefix)
+    
+    def _count_prefix(self, prefix: str) -> int:
+        """Повертає лічильник слів у піддереві вузла префікса"""
         current = self.root
         
         # Проходимо по символах префікса
         for char in prefix:
-            if char not in current.children:
-                return False
-            current = current.children[char]
+            current = current.children.get(char)
+            if current is None:
+                return 0
         
-        # Перевіряємо, чи є хоча б одне слово, що починається з цього префікса
-        return self._has_words_in_subtree(current)
+        return current.word_count
     
-    def _has_words_in_subtree(self, node) -> bool:
+    @staticmethod
+    def _check_page(limit: Optional[int], after: Optional[str]):
+        """Перевіряє параметри сторінки: ліміт і курсор"""
+        if limit is not None and limit < 0:
+            raise ValueError("Ліміт не може бути від'ємним")
+        
+        if after is not None and not isinstance(after, str):
+            raise TypeError("Курсор повинен бути рядком")
+    
+    @staticmethod
+    def _iter_sorted(root, prefix: str, after: Optional[str]) -> Iterator[str]:
+        """
+        Обходить піддерево prefix явним стеком і віддає слова в
+        лексикографічному порядку, починаючи з першого слова, більшого за after
+        
+        Курсор не потребує стану: шлях after проходиться один раз, а в стек
+        кладуться лише братські гілки, що лежать правіше за нього.
+        """
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return
+        
+        if after is None or after < prefix:
+            stack = [(node, prefix)]
+        elif not after.startswith(prefix):
+            # Усі слова піддерева лежать лівіше за курсор
+            return
+        else:
+            stack = []
+            word = prefix
+            for char in after[len(prefix):]:
+                next_node = None
+                for label, child in sorted(node.children.items(), reverse=True):
+                    if label > char:
+                        stack.append((child, word + label))
+                    elif label == char:
+                        next_node = child
+                if next_node is None:
+                    break
+                node = next_node
+                word += char
+            else:
+                # Сам курсор пропускаємо, його продовження йдуть першими
+                for label, child in sorted(node.children.items(), reverse=True):
+                    stack.append((child, word + label))
+        
+        while stack:
+            node, word = stack.pop()
+            if node.is_end_of_word:
+                yield word
+            # Менший символ кладемо останнім, щоб він вийшов зі стеку першим
+            for label, child in sorted(node.children.items(), reverse=True):
+                stack.append((child, word + label))
+    
+    def iter_keys(self, limit: Optional[int] = None, after: Optional[str] = None) -> Iterator[str]:
         """
-        Допоміжний метод для перевірки наявності слів у піддереві
+        Ліниво перелічує всі слова в лексикографічному порядку
         
         Args:
-            node: вузол Trie для перевірки
+            limit: найбільша кількість слів (None - без обмеження)
+            after: курсор - останнє слово попередньої сторінки
             
         Returns:
-            True, якщо в піддереві є хоча б одне слово
+            Ітератор слів
+        """
+        return self.iter_keys_with_prefix('', limit, after)
+    
+    def iter_keys_with_prefix(self, prefix: str, limit: Optional[int] = None,
+                              after: Optional[str] = None) -> Iterator[str]:
         """
-        # Якщо поточний вузол є кінцем слова
-        if node.is_end_of_word:
-            return True
+        Ліниво перелічує слова з заданим префіксом у лексикографічному порядку
         
-        # Рекурсивно перевіряємо всі дочірні вузли
-        for child in node.children.values():
-            if self._has_words_in_subtree(child):
-                return True
+        Список результатів не будується: для сторінки автодоповнення
+        достатньо передати limit, а наступну сторінку почати з
+        after=останнє слово попередньої.
         
-        return False
+        Args:
+            prefix: префікс (порожній - усі слова)
+            limit: найбільша кількість слів (None - без обмеження)
+            after: курсор - слова віддаються, починаючи з першого більшого за нього
+            
+        Returns:
+            Ітератор слів
+            
+        Raises:
+            TypeError: якщо prefix або after не є рядком
+            ValueError: якщо limit від'ємний
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Префікс повинен бути рядком")
+        self._check_page(limit, after)
+        
+        return islice(self._iter_sorted(self.root, prefix, after), limit)
     
-    def get_words_with_suffix(self, pattern: str) -> list:
+    def iter_words_with_suffix(self, pattern: str, limit: Optional[int] = None,
+                               after: Optional[str] = None) -> Iterator[str]:
         """
-        Додатковий метод: повертає список слів, що закінчуються заданим суфіксом
+        Ліниво перелічує слова, що закінчуються заданим суфіксом
+        
+        З індексом суфіксів обходиться лише піддерево суфікса, і слова
+        йдуть у лексикографічному порядку обернених слів (так вони лежать
+        в індексі); без індексу обходиться все дерево, і порядок -
+        звичайний лексикографічний. Курсор after задається тим самим
+        словом, що було останнім на попередній сторінці.
         
         Args:
             pattern: суфікс для пошуку
+            limit: найбільша кількість слів (None - без обмеження)
+            after: курсор - останнє слово попередньої сторінки
             
         Returns:
-            Список слів з заданим суфіксом
+            Ітератор слів
+            
+        Raises:
+            TypeError: якщо pattern або after не є рядком
+            ValueError: якщо pattern порожній або limit від'ємний
         """
         if not isinstance(pattern, str):
             raise TypeError("Шаблон повинен бути рядком")
         
         if not pattern:
             raise ValueError("Шаблон не може бути порожнім")
+        self._check_page(limit, after)
+        
+        if self._suffix_root is None:
+            words = (key for key in self._iter_sorted(self.root, '', after) if key.endswith(pattern))
+        else:
+            reversed_after = after[::-1] if after is not None else None
+            words = (key[::-1] for key in self._iter_sorted(self._suffix_root, pattern[::-1], reversed_after))
+        
+        return islice(words, limit)
+    
+    def top_k_with_prefix(self, prefix: str, k: int) -> List[Tuple[str, object]]:
+        """
+        Повертає k слів із заданим префіксом з найбільшими значеннями
+        
+        Значення слів слугують оцінками популярності; слова з нечисловим
+        значенням (зокрема None) не ранжуються. Кожен вузол знає найкращу
+        оцінку у своєму піддереві, тож пошук за найкращим першим розкриває
+        лише гілки, що можуть потрапити у відповідь: вартість залежить від
+        k і довжини слів, а не від кількості слів із префіксом.
+        
+        Args:
+            prefix: префікс (порожній - серед усіх слів)
+            k: кількість слів
+            
+        Returns:
+            Пари (слово, значення) за спаданням значення; рівні значення
+            впорядковані за словом
+            
+        Raises:
+            TypeError: якщо prefix не є рядком
+            ValueError: якщо k від'ємне
+        """
+        if not isinstance(prefix, str):
+            raise TypeError("Префікс повинен бути рядком")
+        
+        if k < 0:
+            raise ValueError("Кількість слів не може бути від'ємною")
+        
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        
+        if not k or node.best_score is None:
+            return []
+        
+        # Елементи купи: (-оцінка, рядок, вид, вузол); вид 0 - готове слово,
+        # 1 - піддерево з найкращою оцінкою. Слово виходить з купи лише тоді,
+        # коли жодне нерозкрите піддерево не може дати кращого
+        heap = [(-node.best_score, prefix, 1, node)]
+        result = []
+        while heap and len(result) < k:
+            negative_score, word, kind, node = heapq.heappop(heap)
+            if kind == 0:
+                result.append((word, node.value))
+                continue
+            if node.is_end_of_word and score_of(node.value) is not None:
+                heapq.heappush(heap, (-score_of(node.value), word, 0, node))
+            for char, child in node.children.items():
+                if child.best_score is not None:
+                    heapq.heappush(heap, (-child.best_score, word + char, 1, child))
+        
+        return result
+    
+    def fuzzy_keys(self, query: str, max_distance: int, prefix: bool = False) -> List[str]:
+        """
+        Повертає слова, відстань Левенштейна яких до запиту не перевищує max_distance
+        
+        Обхід дерева несе рядок динамічного програмування: рядок дочірнього
+        вузла обчислюється з рядка батьківського за O(len(query)), тож
+        спільні префікси слів рахуються один раз. Гілка відкидається,
+        щойно мінімум рядка перевищує межу - жодне її продовження вже не
+        може бути ближчим, тому відвідується лише мала частина вузлів.
+        
+        Args:
+            query: запит (можливо, з помилками)
+            max_distance: найбільша допустима кількість вставок, видалень і замін
+            prefix: шукати слова, префікс яких близький до запиту
+                (нечітке автодоповнення), а не слова цілком
+            
+        Returns:
+            Слова за зростанням відстані, з однаковою відстанню - за абеткою
+            
+        Raises:
+            TypeError: якщо query не є рядком
+            ValueError: якщо query порожній або max_distance від'ємна
+        """
+        if not isinstance(query, str):
+            raise TypeError("Запит повинен бути рядком")
+        
+        if not query:
+            raise ValueError("Запит не може бути порожнім")
+        
+        if max_distance < 0:
+            raise ValueError("Відстань не може бути від'ємною")
+        
+        first_row = list(range(len(query) + 1))
+        matches = []
+        # Елементи стеку: (вузол, слово, рядок відстаней, найменша відстань
+        # від запиту до префікса слова на шляху - для режиму prefix)
+        stack = [(self.root, '', first_row, first_row[-1])]
+        while stack:
+            node, word, row, best = stack.pop()
+            if node.is_end_of_word:
+                distance = best if prefix else row[-1]
+                if distance <= max_distance:
+                    matches.append((distance, word))
+            
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for column, query_char in enumerate(query, 1):
+                    next_row.append(min(next_row[column - 1] + 1,
+                                        row[column] + 1,
+                                        row[column - 1] + (query_char != char)))
+                next_best = min(best, next_row[-1])
+                # У режиму prefix піддерево вже знайденого префікса входить у відповідь цілком
+                if min(next_row) <= max_distance or (prefix and next_best <= max_distance):
+                    stack.append((child, word + char, next_row, next_best))
         
-        all_keys = self.keys()
-        return [key for key in all_keys if key.endswith(pattern)]
+        matches.sort()
+        return [word for _, word in matches]
+    
+    @staticmethod
+    def _validate_queries(queries: Iterable[str], name: str) -> List[str]:
+        """Перевіряє пакет запитів і повертає його списком"""
+        queries = list(queries)
+        for query in queries:
+            if not isinstance(query, str):
+                raise TypeError(f"{name} повинен бути рядком")
+            if not query:
+                raise ValueError(f"{name} не може бути порожнім")
+        return queries
+    
+    def has_prefix_many(self, prefixes: Iterable[str]) -> array:
+        """
+        Пакетний has_prefix: перевіряє одразу багато префіксів
+        
+        Запити перевіряються одним проходом; у замороженому дереві вони
+        сортуються, і проходи для префіксів зі спільним початком діляться.
+        
+        Args:
+            prefixes: префікси для перевірки
+            
+        Returns:
+            array('B') з 1 для префіксів, з якими є слова, і 0 для решти,
+            у порядку запитів
+            
+        Raises:
+            TypeError: якщо префікс не є рядком
+            ValueError: якщо префікс порожній
+        """
+        prefixes = self._validate_queries(prefixes, "Префікс")
+        counts = count_paths(self.root, prefixes)
+        return array('B', [count > 0 for count in counts])
+    
+    def count_suffix_many(self, patterns: Iterable[str]) -> array:
+        """
+        Пакетний count_words_with_suffix: підраховує слова для багатьох суфіксів
+        
+        З індексом суфіксів обернені шаблони проходять індекс так само, як
+        префікси в has_prefix_many; без індексу всі шаблони обслуговує
+        один обхід ключів дерева.
+        
+        Args:
+            patterns: суфікси для пошуку
+            
+        Returns:
+            array('q') з кількістю слів для кожного суфікса, у порядку запитів
+            
+        Raises:
+            TypeError: якщо шаблон не є рядком
+            ValueError: якщо шаблон порожній
+        """
+        patterns = self._validate_queries(patterns, "Шаблон")
+        
+        if self._suffix_root is not None:
+            return count_paths(self._suffix_root, [pattern[::-1] for pattern in patterns])
+        
+        # Кожен суфікс кожного ключа шукаємо серед шаблонів
+        totals = dict.fromkeys(patterns, 0)
+        longest = max(map(len, totals), default=0)
+        for key in self._iter_sorted(self.root, '', None):
+            for start in range(max(0, len(key) - longest), len(key)):
+                suffix = key[start:]
+                if suffix in totals:
+                    totals[suffix] += 1
+        return array('q', [totals[pattern] for pattern in patterns])
+    
+    def get_words_with_suffix(self, pattern: str) -> list:
+        """
+        Додатковий метод: повертає список слів, що закінчуються заданим суфіксом
+        
+        Args:
+            pattern: суфікс для пошуку
+            
+        Returns:
+            Відсортований список слів з заданим суфіксом
+        """
+        return sorted(self.iter_words_with_suffix(pattern))
     
     def get_statistics(self) -> dict:
         """
         Додатковий метод: повертає статистику про Trie
         
+        Усі показники підтримуються при put/delete, тож виклик не обходить
+        дерево: кількість вузлів без кореня і є кількістю унікальних префіксів
+        
         Returns:
             Словник зі статистикою
         """
-        all_keys = self.keys()
-        
-        if not all_keys:
+        # Кожен агрегат читається один раз: у конкурентному режимі запис
+        # може змінити їх між зверненнями
+        total_words = self.size
+        total_characters = self._total_characters
+        histogram = self._length_histogram
+        if not total_words:
             return {
                 'total_words': 0,
                 'total_characters': 0,
                 'average_word_length': 0,
                 'shortest_word': None,
                 'longest_word': None,
-                'unique_prefixes': 0
+                'unique_prefixes': 0,
+                'length_histogram': {}
             }
         
-        total_words = len(all_keys)
-        total_characters = sum(len(word) for word in all_keys)
-        average_length = total_characters / total_words if total_words > 0 else 0
-        
-        shortest_word = min(all_keys, key=len)
-        longest_word = max(all_keys, key=len)
-        
-        # Підрахунок унікальних префіксів
-        prefixes = set()
-        for word in all_keys:
-            for i in range(1, len(word) + 1):
-                prefixes.add(word[:i])
+        average_length = total_characters / total_words
         
         return {
             'total_words': total_words,
             'total_characters': total_characters,
             'average_word_length': round(average_length, 2),
-            'shortest_word': shortest_word,
-            'longest_word': longest_word,
-            'unique_prefixes': len(prefixes)
+            'shortest_word': self._shortest_word,
+            'longest_word': self._longest_word,
+            'unique_prefixes': self._node_count,
+            'length_histogram': dict(sorted(histogram.items()))
         }
 
 
@@ -256,6 +977,55 @@ if __name__ == "__main__":
     assert trie.has_prefix("ban") == True  # banana
     assert trie.has_prefix("ca") == True  # cat
     
+    # Перевірка кількості слів із заданим префіксом
+    assert trie.count_words_with_prefix("app") == 2  # apple, application
+    assert trie.count_words_with_prefix("bat") == 0
+    
+    # Найпопулярніші слова з префіксом (значення - оцінки)
+    assert trie.top_k_with_prefix("app", 1) == [("application", 1)]
+    
+    # Нечіткий пошук знаходить слова із запитів з помилками
+    assert trie.fuzzy_keys("aplication", 1) == ["application"]
+    assert trie.fuzzy_keys("aplic", 1, prefix=True) == ["application"]
+    
+    # Пакетні запити повертають масиви в порядку запитів
+    assert list(trie.has_prefix_many(["bat", "app", "ca"])) == [0, 1, 1]
+    assert list(trie.count_suffix_many(["at", "e", "xyz"])) == [1, 1, 0]
+    
+    # Ліниве перелічення сторінками з курсором
+    assert list(trie.iter_keys_with_prefix("app", limit=1)) == ["apple"]
+    assert list(trie.iter_keys_with_prefix("app", after="apple")) == ["application"]
+    
+    # Масова побудова з відсортованих ключів дає те саме дерево
+    bulk_trie = Homework.from_sorted(sorted(words), minimize=True)
+    assert bulk_trie.count_words_with_suffix("ion") == 1
+    assert bulk_trie.has_prefix("ban") == True
+    
+    # Мінімізація об'єднує однакові закінчення: "card(s)" і "ward(s)" ділять вузли
+    dawg = Homework.from_sorted(["card", "cards", "ward", "wards"], minimize=True)
+    assert dawg.root.trie.node_count == 6
+    assert list(dawg.iter_keys_with_prefix("w")) == ["ward", "wards"]
+    
+    # Знімок у файлі читається через mmap без десеріалізації
+    snapshot_path = os.path.join(tempfile.mkdtemp(), "trie.bin")
+    trie.save(snapshot_path)
+    mapped_trie = Homework.load(snapshot_path, mmap=True)
+    assert mapped_trie.get("banana") == 2
+    assert mapped_trie.count_words_with_suffix("at") == 1
+    assert mapped_trie.has_prefix("app") == True
+    
+    # Збереження під час записів з іншого потоку дає узгоджений знімок:
+    # кількість слів у метаданих збігається з деревом з того ж файлу
+    live_trie = Homework(concurrent=True)
+    writer = threading.Thread(target=lambda: [live_trie.put(f"word{i}", i) for i in range(20000)])
+    writer.start()
+    while writer.is_alive():
+        live_trie.save(snapshot_path)
+        saved = Homework.load(snapshot_path, mmap=False)
+        assert saved.size == saved.count_words_with_prefix("word") == sum(1 for _ in saved.iter_keys())
+        assert saved.get_statistics()['total_characters'] == sum(len(key) for key in saved.iter_keys())
+    writer.join()
+    
     print("✅ Усі основні тести пройдено успішно!")
     print()
     